@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Learner, Mentor, Booking, DietPlan
+from .models import User, Learner, Mentor, Booking, DietPlan, FoodItem
 
 class MentorAdmin(admin.ModelAdmin):
     list_display = ('user', 'status', 'specialization', 'experience', 'has_first_aid_certification', 'passed_safety_quiz')
@@ -7,8 +7,20 @@ class MentorAdmin(admin.ModelAdmin):
     search_fields = ('user__full_name', 'specialization')
     readonly_fields = ('application_text', 'form_check_video_url')
 
+class FoodItemAdmin(admin.ModelAdmin):
+    list_display = ('name', 'category', 'vegetarian', 'serving', 'calories', 'protein', 'carbs', 'fat')
+    list_filter = ('category', 'vegetarian')
+
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'session_date', 'duration', 'status', 'points_awarded')
+    list_filter = ('status',)
+    # __str__ names both participants; join their users instead of querying per row.
+    list_select_related = ('mentor__user', 'learner__user')
+    raw_id_fields = ('learner', 'mentor')
+
 admin.site.register(User)
 admin.site.register(Learner)
 admin.site.register(Mentor, MentorAdmin)
-admin.site.register(Booking)
-admin.site.register(DietPlan)
\ No newline at end of file
+admin.site.register(Booking, BookingAdmin)
+admin.site.register(DietPlan)
+admin.site.register(FoodItem, FoodItemAdmin)
\ No newline at end of file
@@ -1,44 +1,181 @@
-import random
+import os
+import time
+from functools import lru_cache
 
-def generate_smart_diet_plan(goal, preference):
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from .models import DietPlan, FoodItem, Learner
+
+# Daily targets per goal: (calories kcal, protein g, focus).
+GOAL_TARGETS = {
+    'weight_loss': (1650, 120, "High Protein, Low Carb, Calorie Deficit"),
+    'muscle_gain': (2650, 160, "High Protein, Moderate Carb, Calorie Surplus"),
+}
+DEFAULT_TARGET = (2100, 100, "Balanced Macros, High Hydration")  # stamina, flexibility, etc.
+
+# Each meal is a list of (category, allowed portion multipliers).
+MAIN = (1.0, 1.5, 2.0)
+SIDE = (1.0,)
+MEALS = [
+    ('breakfast', [('carb', MAIN), ('fat', SIDE), ('protein', MAIN)]),
+    ('snack_1', [('fruit', SIDE), ('fat', SIDE)]),
+    ('lunch', [('carb', MAIN), ('protein', MAIN), ('veggie', SIDE)]),
+    ('snack_2', [('protein', SIDE)]),
+    ('dinner', [('protein', MAIN), ('veggie', SIDE)]),
+]
+MACROS = ('calories', 'protein', 'carbs', 'fat')
+
+CANDIDATES = 4096
+REPEAT_PENALTY = 0.05  # per repeated protein, so the day isn't chicken three times
+PLAN_VARIANTS = 8  # distinct seeds the view rotates through
+
+# Bumped in the shared cache whenever the food catalog changes, and part of
+# build_diet_plan's key, so every worker process stops using old plans.
+CATALOG_VERSION_KEY = 'food_catalog_version'
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+def _catalog(preference):
+    """Returns {category: (items, macros array of shape (items, 4))}."""
+    import numpy as np
+
+    foods = FoodItem.objects.order_by('pk')
+    if preference == 'vegetarian':
+        foods = foods.filter(vegetarian=True)
+    catalog = {}
+    for food in foods:
+        catalog.setdefault(food.category, []).append(food)
+    return {
+        category: (items, np.array([[getattr(f, m) for m in MACROS] for f in items]))
+        for category, items in catalog.items()
+    }
+
+
+def _describe(parts):
+    names = [
+        f"{portion:g} x {food.name} ({food.serving})" if portion != 1 else f"{food.name} ({food.serving})"
+        for food, portion in parts
+    ]
+    return names[0] if len(names) == 1 else f"{', '.join(names[:-1])} and {names[-1]}"
+
+
+@lru_cache(maxsize=256)
+def build_diet_plan(goal, preference, seed, version=None):
     """
-    Generates a dynamic 24-hour meal plan based on user goal and diet type.
+    Picks the meal combination closest to the goal's calorie and protein
+    targets out of CANDIDATES random draws from the food catalog.
+
+    All candidates are scored at once: one row per candidate day, one column
+    per meal slot, with macro totals summed over the slot axis. Cached per
+    (goal, preference, seed, catalog version); `version` is only part of the
+    key, and a FoodItem change bumps it.
     """
-    
-    # 1. Calorie & Macro Logic
-    if goal == 'weight_loss':
-        calories = "1500-1800 kcal"
-        focus = "High Protein, Low Carb, Calorie Deficit"
-    elif goal == 'muscle_gain':
-        calories = "2500-2800 kcal"
-        focus = "High Protein, Moderate Carb, Calorie Surplus"
-    else: # stamina, flexibility, etc.
-        calories = "2000-2200 kcal"
-        focus = "Balanced Macros, High Hydration"
-
-    # 2. Food Database (Vegetarian vs Non-Veg)
-    if preference == 'vegetarian':
-        proteins = ["Paneer Tikka", "Lentil Soup (Dal)", "Chickpea Salad", "Greek Yogurt", "Tofu Stir-fry", "Soy Chunks", "Quinoa"]
-    else:
-        proteins = ["Grilled Chicken Breast", "Salmon/Fish", "Boiled Eggs", "Lean Turkey", "Chicken Curry (Light oil)", "Tuna Salad"]
+    import numpy as np
 
-    carbs = ["Brown Rice", "Oatmeal", "Sweet Potato", "Whole Wheat Roti", "Multigrain Bread"]
-    fats = ["Almonds & Walnuts", "Olive Oil dressing", "Avocado", "Peanut Butter", "Chia Seeds"]
-    fruits = ["Apple", "Banana", "Berries", "Orange", "Papaya"]
-    veggies = ["Spinach", "Broccoli", "Mixed Veggies", "Cucumber Salad", "Steamed Beans"]
+    target_kcal, target_protein, focus = GOAL_TARGETS.get(goal, DEFAULT_TARGET)
+    catalog = _catalog(preference)
+    slots = [
+        (meal, category, np.array(portions))
+        for meal, parts in MEALS for category, portions in parts if category in catalog
+    ]
+    if not slots:
+        return None
+
+    rng = np.random.default_rng(seed)
+    picks, amounts, totals = [], [], np.zeros((CANDIDATES, len(MACROS)))
+    for _, category, portions in slots:
+        items, macros = catalog[category]
+        pick = rng.integers(len(items), size=CANDIDATES)
+        amount = rng.choice(portions, size=CANDIDATES)
+        totals += macros[pick] * amount[:, None]
+        picks.append(pick)
+        amounts.append(amount)
+
+    error = (
+        np.abs(totals[:, 0] - target_kcal) / target_kcal
+        + np.abs(totals[:, 1] - target_protein) / target_protein
+    )
+    protein_picks = [pick for pick, (_, category, _) in zip(picks, slots) if category == 'protein']
+    if protein_picks:
+        protein_picks = np.sort(np.stack(protein_picks, axis=1), axis=1)
+        error += REPEAT_PENALTY * (np.diff(protein_picks, axis=1) == 0).sum(axis=1)
+    best = int(np.argmin(error))
+
+    meals, meal_macros = {}, {}
+    for (meal, category, _), pick, amount in zip(slots, picks, amounts):
+        items, macros = catalog[category]
+        meals.setdefault(meal, []).append((items[pick[best]], float(amount[best])))
+        meal_macros[meal] = meal_macros.get(meal, 0) + macros[pick[best]] * amount[best]
 
-    # 3. Randomize Meals
     plan = {
         'goal_title': goal.replace('_', ' ').title(),
-        'preference': preference.title(),
-        'calories': calories,
+        'preference': preference.replace('_', ' ').title(),
+        'calories': f"{target_kcal} kcal, {target_protein} g protein",
         'focus': focus,
-        'breakfast': f"Bowl of {random.choice(carbs)} with {random.choice(fats)} and a side of {proteins[0]}.",
-        'snack_1': f"A fresh {random.choice(fruits)} and a handful of {random.choice(fats)}.",
-        'lunch': f"1 cup {random.choice(carbs)}, a large portion of {proteins[1]}, and {random.choice(veggies)}.",
-        'snack_2': "Protein Shake or Greek Yogurt with seeds.",
-        'dinner': f"Light salad with {proteins[2]} and {random.choice(veggies)} (Avoid heavy carbs at night).",
-        'tip': "Drink 3-4 liters of water. Consistency is key!"
+        'totals': dict(zip(MACROS, (round(float(v)) for v in totals[best]))),
+        'macros': {
+            meal: dict(zip(MACROS, (round(float(v)) for v in values)))
+            for meal, values in meal_macros.items()
+        },
+        'tip': "Drink 3-4 liters of water. Consistency is key!",
     }
-    
-    return plan
\ No newline at end of file
+    for meal, parts in meals.items():
+        plan[meal] = _describe(parts)
+    return plan
+
+
+def generate_smart_diet_plan(goal, preference, seed=0):
+    """
+    Generates a 24-hour meal plan for the user's goal and diet type. Plans are
+    shared between callers, so treat the returned dict as read-only.
+    """
+    return build_diet_plan(goal, preference, seed % PLAN_VARIANTS, catalog_version())
+
+
+# --- CACHED DIET PLANS PAGE ---
+DIET_PAGE_TEMPLATE = 'diet_plans.html'
+DIET_PAGE_CACHE_SECONDS = 24 * 3600
+
+
+@lru_cache(maxsize=1)
+def _diet_page_version():
+    # The cache is shared and outlives deploys, so a changed template gets new keys.
+    return int(os.path.getmtime(get_template(DIET_PAGE_TEMPLATE).origin.name))
+
+
+def _diet_page_key(goal):
+    return f'diet_plans_page:{_diet_page_version()}:{goal}'
+
+
+def render_diet_plans_page(goal, goal_display):
+    """
+    Returns the diet plans page HTML for a goal. The page depends only on the
+    goal and its DietPlan rows, so it is rendered once per goal and cached
+    until a DietPlan changes.
+    """
+    key = _diet_page_key(goal)
+    html = cache.get(key)
+    if html is None:
+        html = get_template(DIET_PAGE_TEMPLATE).render({
+            'diet_plans': DietPlan.objects.filter(goal=goal),
+            'learner_goal': goal_display,
+        })
+        cache.set(key, html, DIET_PAGE_CACHE_SECONDS)
+    return html
+
+
+def invalidate_diet_plans_pages():
+    # A plan can move between goals, so drop every goal's page.
+    cache.delete_many([_diet_page_key(goal) for goal, _ in Learner.GOAL_CHOICES])
@@ -0,0 +1,147 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Booking, Message, MessageArchive
+
+# Bookings that ended less than this long ago are never archived, which lets
+# the chat page skip the archive lookup for them.
+ARCHIVE_AFTER_DAYS = getattr(settings, 'CHAT_ARCHIVE_AFTER_DAYS', 90)
+COMPRESSION_LEVEL = 9
+
+
+def pack_messages(rows):
+    """rows: [[id, sender_id, receiver_id, iso timestamp, content], ...] oldest first."""
+    return zlib.compress(json.dumps(rows, separators=(',', ':')).encode(), COMPRESSION_LEVEL)
+
+
+def unpack_messages(data):
+    return json.loads(zlib.decompress(data))
+
+
+def archived_messages(booking):
+    """
+    Returns the archived messages of a booking as unsaved Message instances,
+    oldest first, with senders taken from the booking's participants.
+    """
+    archive = MessageArchive.objects.filter(booking=booking).only('data').first()
+    if archive is None:
+        return []
+    users = {user.id: user for user in (booking.learner.user, booking.mentor.user)}
+    messages = []
+    for pk, sender_id, receiver_id, sent_at, content in unpack_messages(archive.data):
+        message = Message(
+            id=pk, booking=booking, sender_id=sender_id, receiver_id=receiver_id,
+            content=content, timestamp=datetime.fromisoformat(sent_at),
+        )
+        if sender_id in users:
+            message.sender = users[sender_id]
+        messages.append(message)
+    return messages
+
+
+def may_have_archive(booking):
+    return booking.end_time < timezone.now() - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+
+def archivable_bookings(days=ARCHIVE_AFTER_DAYS):
+    cutoff = timezone.now() - timedelta(days=days)
+    return Booking.objects.filter(end_time__lt=cutoff).filter(
+        Exists(Message.objects.filter(booking=OuterRef('pk')))
+    )
+
+
+def archive_messages(days=ARCHIVE_AFTER_DAYS, batch_size=200, progress=None):
+    """
+    Moves the messages of bookings that ended more than `days` ago into one
+    compressed MessageArchive per booking. Works through `batch_size`
+    bookings at a time, each batch in its own transaction, so memory is
+    bounded by one batch's messages. Messages that arrive for an archived
+    booking are merged into its archive on the next run.
+
+    Returns (bookings, messages) archived. `days` can't be less than
+    ARCHIVE_AFTER_DAYS, or readers would miss the archives.
+    """
+    if days < ARCHIVE_AFTER_DAYS:
+        raise ValueError(f"Chats can't be archived earlier than {ARCHIVE_AFTER_DAYS} days after the session.")
+    bookings = archivable_bookings(days).order_by('pk').values_list('pk', flat=True)
+    total_bookings = total_messages = 0
+    last_pk = 0
+    while True:
+        chunk = list(bookings.filter(pk__gt=last_pk)[:batch_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1]
+        total_messages += _archive_chunk(chunk)
+        total_bookings += len(chunk)
+        if progress:
+            progress(total_bookings, total_messages)
+    return total_bookings, total_messages
+
+
+def _archive_chunk(booking_ids):
+    with transaction.atomic():
+        existing = MessageArchive.objects.in_bulk(booking_ids)
+        rows = (
+            Message.objects.filter(booking_id__in=booking_ids)
+            .order_by('booking_id', 'timestamp', 'id')
+            .values_list('booking_id', 'id', 'sender_id', 'receiver_id', 'timestamp', 'content')
+        )
+        archives, moved, max_id = [], 0, 0
+        for booking_id, messages in groupby(rows.iterator(chunk_size=2000), key=lambda row: row[0]):
+            packed = [[pk, sender, receiver, sent_at.isoformat(), content] for _, pk, sender, receiver, sent_at, content in messages]
+            moved += len(packed)
+            max_id = max(max_id, max(row[0] for row in packed))
+            if booking_id in existing:
+                packed = unpack_messages(existing[booking_id].data) + packed
+                packed.sort(key=lambda row: (row[3], row[0]))
+            archives.append(MessageArchive(
+                booking_id=booking_id, message_count=len(packed), data=pack_messages(packed),
+                first_message_at=datetime.fromisoformat(packed[0][3]),
+                last_message_at=datetime.fromisoformat(packed[-1][3]),
+            ))
+        MessageArchive.objects.bulk_create(
+            archives, update_conflicts=True, unique_fields=['booking'],
+            update_fields=['message_count', 'first_message_at', 'last_message_at', 'data', 'archived_at'],
+        )
+        # Only what was read above; a message saved meanwhile has a higher id and stays live.
+        Message.objects.filter(booking_id__in=booking_ids, id__lte=max_id).delete()
+    return moved
+
+
+def restore_messages(booking_ids=None, batch_size=200, progress=None):
+    """
+    Moves archived messages back into the Message table with their original
+    ids, for all archives or only the given bookings. Returns the number of
+    messages restored.
+    """
+    archives = MessageArchive.objects.order_by('pk')
+    if booking_ids:
+        archives = archives.filter(pk__in=booking_ids)
+    restored, last_pk = 0, 0
+    while True:
+        chunk = list(archives.filter(pk__gt=last_pk)[:batch_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        with transaction.atomic():
+            messages = [
+                Message(
+                    id=pk, booking_id=archive.booking_id, sender_id=sender_id, receiver_id=receiver_id,
+                    content=content, timestamp=datetime.fromisoformat(sent_at),
+                )
+                for archive in chunk
+                for pk, sender_id, receiver_id, sent_at, content in unpack_messages(archive.data)
+            ]
+            Message.objects.bulk_create(messages, batch_size=2000)
+            MessageArchive.objects.filter(pk__in=[archive.pk for archive in chunk]).delete()
+        restored += len(messages)
+        if progress:
+            progress(restored)
+    return restored
@@ -0,0 +1,107 @@
+"""
+Async versions of the dashboard, bookings, progress and leaderboard views,
+enabled with settings.ASYNC_VIEWS. They build the same context as the views
+in views.py with the async ORM, so a request waiting on the database doesn't
+hold a worker thread. The queries still run one after another: Django's
+ASGI handler runs every thread-sensitive call of a request, async ORM
+included, on the same thread. Templates are rendered in a thread once the
+context is fully loaded, so nothing lazy is evaluated on the event loop.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from .booking_utils import get_learner_summary, get_mentor_summary
+from .leaderboard_utils import leaderboard
+from .models import Booking, User
+from .recommendation_utils import get_recommended_mentors
+
+arender = sync_to_async(render)
+
+
+async def _fetch(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _load_user(request):
+    # request.user is a separate lazy object, and templates read it through
+    # the auth context processor; share the loaded user so it isn't fetched twice.
+    user = await request.auser()
+    # ModelBackend sessions (still accepted, see AUTHENTICATION_BACKENDS) load
+    # the user without the profiles ProfileBackend joins; reading them later
+    # would be a sync query on the event loop.
+    if not (User.learner.related.is_cached(user) and User.mentor.related.is_cached(user)):
+        user = await User.objects.select_related('learner', 'mentor').aget(pk=user.pk)
+    request.user = user
+    return user
+
+
+@login_required
+async def learner_dashboard_view(request):
+    user = await _load_user(request)
+    learner = user.learner
+    recommended_mentors = await sync_to_async(get_recommended_mentors)(learner)
+    summary = await sync_to_async(get_learner_summary)(learner)
+    return await arender(request, 'learner_dash.html', {
+        'learner': learner,
+        'recommended_mentors': recommended_mentors,
+        'upcoming_session_count': summary['upcoming'],
+        'completed_session_count': summary['completed'],
+        'points_given_to_mentors': summary['completed_points'],
+    })
+
+
+@login_required
+async def mentor_dashboard_view(request):
+    user = await _load_user(request)
+    mentor = user.mentor
+    upcoming_bookings = await _fetch(
+        Booking.objects.filter(mentor=mentor, end_time__gte=timezone.now())
+        .select_related('learner__user').order_by('session_date')
+    )
+    summary = await sync_to_async(get_mentor_summary)(mentor)
+    return await arender(request, 'mentor_dash.html', {
+        'mentor': mentor,
+        'upcoming_bookings': upcoming_bookings,
+        'total_session_count': summary['total'],
+    })
+
+
+@login_required
+async def booking_view(request):
+    user = await _load_user(request)
+    now = timezone.now()
+    all_bookings = Booking.objects.select_related('mentor__user', 'learner__user')
+    if user.role == 'learner':
+        bookings = all_bookings.filter(learner=user.learner)
+    else:
+        bookings = all_bookings.filter(mentor=user.mentor)
+    upcoming = await _fetch(bookings.filter(end_time__gte=now).order_by('session_date'))
+    completed = await _fetch(bookings.filter(end_time__lt=now).order_by('-session_date'))
+    return await arender(request, 'booking.html', {
+        'upcoming_sessions': upcoming, 'completed_sessions': completed, 'user_role': user.role,
+    })
+
+
+@login_required
+async def leaderboard_view(request):
+    # Served from memory; only a (re)load touches the database.
+    mentors = await sync_to_async(leaderboard.top)(10)
+    return await arender(request, 'leaderboard.html', {'mentors': mentors})
+
+
+@login_required
+async def progress_tracker_view(request):
+    user = await _load_user(request)
+    learner = user.learner
+    completed = await _fetch(
+        Booking.objects.filter(learner=learner, end_time__lt=timezone.now())
+        .select_related('mentor__user')
+    )
+    summary = await sync_to_async(get_learner_summary)(learner)
+    return await arender(request, 'progress_track.html', {
+        'completed_sessions': completed,
+        'session_count': summary['past'],
+        'total_points': summary['past_points'],
+    })
@@ -0,0 +1,165 @@
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Booking, Mentor
+
+SLOT_MINUTES = 30
+# Bookable hours in local time; slots are offered on the :00/:30 grid inside them.
+DAY_START = time(6, 0)
+DAY_END = time(22, 0)
+SUMMARY_CACHE_SECONDS = 3600
+
+
+def _ceil_to_slot(moment, slot):
+    moment = timezone.localtime(moment)
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = moment - midnight
+    return midnight + -(-offset // slot) * slot
+
+
+def _daily_windows(start, end):
+    """Yields the bookable [open, close) window of every local day between start and end."""
+    day = timezone.localtime(start).date()
+    last_day = timezone.localtime(end).date()
+    while day <= last_day:
+        opens = timezone.make_aware(datetime.combine(day, DAY_START))
+        closes = timezone.make_aware(datetime.combine(day, DAY_END))
+        opens, closes = max(opens, start), min(closes, end)
+        if opens < closes:
+            yield opens, closes
+        day += timedelta(days=1)
+
+
+def _free_slots(busy, start, end, slot):
+    """
+    Sweeps the sorted busy intervals of one mentor against the daily windows
+    and emits every slot start that fits entirely inside a gap.
+    """
+    slots = []
+    busy = iter(busy)
+    current = next(busy, None)
+    for opens, closes in _daily_windows(start, end):
+        cursor = opens
+        while cursor < closes:
+            # Skip bookings that ended before the cursor.
+            while current is not None and current[1] <= cursor:
+                current = next(busy, None)
+            gap_end = closes if current is None else min(closes, current[0])
+            slot_start = _ceil_to_slot(cursor, slot)
+            while slot_start + slot <= gap_end:
+                slots.append(slot_start)
+                slot_start += slot
+            if current is None or current[0] >= closes:
+                break
+            cursor = max(cursor, current[1])
+    return slots
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+def create_booking(learner, mentor, session_start, duration=SLOT_MINUTES):
+    """
+    Books a session if the mentor is free, atomically with the overlap check.
+
+    Bookings for the same mentor are serialized by locking the mentor row
+    (SELECT ... FOR UPDATE on MySQL). SQLite ignores FOR UPDATE, but the
+    database runs transactions in IMMEDIATE mode, which takes the write lock
+    at BEGIN, so the check and insert can't interleave there either.
+    Raises SlotUnavailable when the slot overlaps an existing booking.
+    """
+    session_end = session_start + timedelta(minutes=duration)
+    with transaction.atomic():
+        Mentor.objects.select_for_update().only('pk').get(pk=mentor.pk)
+        if Booking.objects.filter(
+            mentor=mentor,
+            session_date__lt=session_end,
+            end_time__gt=session_start,
+        ).exists():
+            raise SlotUnavailable
+        return Booking.objects.create(learner=learner, mentor=mentor, session_date=session_start, duration=duration)
+
+
+def get_free_slots(mentors, start, end, slot_minutes=SLOT_MINUTES):
+    """
+    Returns {mentor_id: [slot start datetimes]} of free slots in [start, end)
+    for one mentor or a list of mentors (instances or ids). All bookings are
+    loaded in a single range query on (mentor, end_time).
+    """
+    if not isinstance(mentors, (list, tuple, set)):
+        mentors = [mentors]
+    mentor_ids = [getattr(m, 'pk', m) for m in mentors]
+    start = max(start, timezone.now())
+    slot = timedelta(minutes=slot_minutes)
+
+    busy = {mentor_id: [] for mentor_id in mentor_ids}
+    bookings = Booking.objects.filter(
+        mentor_id__in=mentor_ids,
+        end_time__gt=start,
+        session_date__lt=end,
+    ).order_by('mentor_id', 'session_date').values_list('mentor_id', 'session_date', 'end_time')
+    for mentor_id, session_start, session_end in bookings:
+        busy[mentor_id].append((session_start, session_end))
+
+    return {
+        mentor_id: _free_slots(intervals, start, end, slot)
+        for mentor_id, intervals in busy.items()
+    }
+
+
+def group_slots_by_day(slots):
+    """Groups slot datetimes into [(date, [local times])] for rendering a grid."""
+    days = {}
+    for slot in slots:
+        local = timezone.localtime(slot)
+        days.setdefault(local.date(), []).append(local.time())
+    return list(days.items())
+
+
+def _summary_key(role, pk):
+    return f'booking_summary:{role}:{pk}'
+
+
+def _booking_summary(role, pk, bookings):
+    """
+    Counts and point totals for one learner's or mentor's bookings, computed
+    with a single conditional aggregate and cached until a booking of theirs
+    changes or their next session ends (when upcoming becomes past).
+    """
+    key = _summary_key(role, pk)
+    summary = cache.get(key)
+    if summary is None:
+        now = timezone.now()
+        upcoming, past, completed = Q(end_time__gte=now), Q(end_time__lt=now), Q(status='completed')
+        summary = bookings.aggregate(
+            total=Count('id'),
+            upcoming=Count('id', filter=upcoming),
+            past=Count('id', filter=past),
+            past_points=Coalesce(Sum('points_awarded', filter=past), 0),
+            completed=Count('id', filter=completed),
+            completed_points=Coalesce(Sum('points_awarded', filter=completed), 0),
+            next_end=Min('end_time', filter=upcoming),
+        )
+        timeout = SUMMARY_CACHE_SECONDS
+        if summary['next_end'] is not None:
+            timeout = min(timeout, max(1, (summary['next_end'] - now).total_seconds()))
+        cache.set(key, summary, timeout)
+    return summary
+
+
+def get_learner_summary(learner):
+    return _booking_summary('learner', learner.pk, Booking.objects.filter(learner_id=learner.pk))
+
+
+def get_mentor_summary(mentor):
+    return _booking_summary('mentor', mentor.pk, Booking.objects.filter(mentor_id=mentor.pk))
+
+
+def invalidate_booking_summaries(booking):
+    cache.delete_many([_summary_key('learner', booking.learner_id), _summary_key('mentor', booking.mentor_id)])
@@ -0,0 +1,161 @@
+import json
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .archive_utils import archived_messages, may_have_archive
+from .models import ChatReadState, Message
+
+HISTORY_PAGE_SIZE = 50
+PREVIEW_LENGTH = 140
+
+
+def get_message_page(booking, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Returns (messages, has_more): up to `limit` messages of a booking, oldest
+    first, that come before the message with id `before` (or the latest ones).
+    Pages are keyset ranges on the (booking, timestamp, id) index, and senders
+    are joined in the same query. Once the live messages run out, paging
+    continues into the booking's MessageArchive; only bookings old enough to
+    have been archived, or a `before` id that isn't live, look for one.
+    """
+    messages = Message.objects.filter(booking=booking).select_related('sender')
+    if before is not None:
+        anchor = Message.objects.filter(booking=booking, pk=before).values_list('timestamp', flat=True).first()
+        if anchor is None:
+            return _archived_page(booking, before, limit)
+        messages = messages.filter(Q(timestamp__lt=anchor) | Q(timestamp=anchor, id__lt=before))
+    page = list(messages.order_by('-timestamp', '-id')[:limit + 1])
+    if len(page) > limit or not may_have_archive(booking):
+        return page[:limit][::-1], len(page) > limit
+    older, has_more = _archived_page(booking, None, limit - len(page))
+    return older + page[::-1], has_more
+
+
+def _archived_page(booking, before, limit):
+    # Archived messages all predate the live ones, so they continue the same order.
+    messages = archived_messages(booking)
+    if before is not None:
+        ids = [message.id for message in messages]
+        if before not in ids:
+            return [], False
+        messages = messages[:ids.index(before)]
+    return (messages[-limit:] if limit else []), len(messages) > limit
+
+
+def serialize_message(message):
+    return {
+        'id': message.id,
+        'message': message.content,
+        'sender_name': message.sender.full_name,
+        'sender_id': message.sender_id,
+        'timestamp': timezone.localtime(message.timestamp).strftime('%I:%M %p'),
+    }
+
+
+# --- INBOX / READ STATE ---
+def create_read_states(booking):
+    ChatReadState.objects.bulk_create(
+        [ChatReadState(user_id=booking.learner_id, booking=booking),
+         ChatReadState(user_id=booking.mentor_id, booking=booking)],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_read_states(bookings, chunk_size=2000):
+    """
+    Creates read states, with their last-message columns filled in, for
+    bookings whose messages were written without going through
+    record_messages (seed data). Existing history counts as read.
+    """
+    latest = Message.objects.filter(booking=OuterRef('pk')).order_by('-timestamp', '-id')
+    rows = bookings.annotate(last_id=Subquery(latest.values('id')[:1])).values_list(
+        'pk', 'learner_id', 'mentor_id', 'last_id',
+    )
+    created, chunk = 0, []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            created += _create_read_states(chunk)
+            chunk = []
+    return created + _create_read_states(chunk)
+
+
+def _create_read_states(rows):
+    last = Message.objects.in_bulk([last_id for *_, last_id in rows if last_id])
+    states = []
+    for booking_id, learner_id, mentor_id, last_id in rows:
+        message = last.get(last_id)
+        for user_id in (learner_id, mentor_id):
+            states.append(ChatReadState(
+                user_id=user_id, booking_id=booking_id,
+                last_message_at=message.timestamp if message else None,
+                last_message_preview=message.content[:PREVIEW_LENGTH] if message else '',
+                last_sender_id=message.sender_id if message else None,
+            ))
+    ChatReadState.objects.bulk_create(states, ignore_conflicts=True)
+    return len(rows)
+
+
+def record_messages(messages):
+    """
+    Applies a batch of newly saved messages to both participants' read states:
+    receivers' unread counts go up, and the last-message columns move to the
+    newest message unless a later one was already recorded (the two sides
+    flush their batches independently). Two UPDATEs per booking in the batch.
+    """
+    by_booking = {}
+    for message in messages:
+        by_booking.setdefault(message.booking_id, []).append(message)
+    with transaction.atomic():
+        for booking_id, batch in by_booking.items():
+            latest = max(batch, key=lambda m: (m.timestamp, m.id or 0))
+            states = ChatReadState.objects.filter(booking_id=booking_id)
+            for receiver_id in {m.receiver_id for m in batch}:
+                received = sum(1 for m in batch if m.receiver_id == receiver_id)
+                states.filter(user_id=receiver_id).update(unread_count=F('unread_count') + received)
+            states.filter(Q(last_message_at__isnull=True) | Q(last_message_at__lte=latest.timestamp)).update(
+                last_message_at=latest.timestamp,
+                last_message_preview=latest.content[:PREVIEW_LENGTH],
+                last_sender_id=latest.sender_id,
+            )
+
+
+def mark_read(user, booking):
+    ChatReadState.objects.filter(user=user, booking=booking).update(unread_count=0, last_read_at=timezone.now())
+
+
+def get_inbox(user):
+    """The user's chats, most recent activity first, in one query on the inbox index."""
+    return (
+        ChatReadState.objects.filter(user=user)
+        .select_related('booking__learner__user', 'booking__mentor__user', 'last_sender')
+        .order_by(F('last_message_at').desc(nulls_last=True), '-booking__session_date')
+    )
+
+
+# --- COMPACT PROTOCOL ---
+# Opt-in wire format for the chat socket (subprotocol "campusfit.compact.v1",
+# or ?compact=1). Names are sent once in a hello frame and messages refer to
+# senders by id, with timestamps as epoch milliseconds:
+#   {"t": "hello", "me": 7, "users": {"7": "Asha", "9": "Ravi"}}
+#   {"t": "m", "m": [[sender_id, ts, text], ...]}          live, coalesced
+#   {"t": "h", "m": [[id, sender_id, ts, text], ...], "more": true}  history
+COMPACT_PROTOCOL = 'campusfit.compact.v1'
+
+
+def dumps_compact(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def epoch_ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def compact_history(messages, has_more):
+    return {
+        't': 'h',
+        'm': [[m.id, m.sender_id, epoch_ms(m.timestamp), m.content] for m in messages],
+        'more': has_more,
+    }
@@ -1,21 +1,83 @@
+import asyncio
 import json
+import logging
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from .models import Message, Booking, User
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from .models import Message, Booking
+from .reminder_utils import notify_group
+from .chat_utils import (
+    COMPACT_PROTOCOL, compact_history, dumps_compact, get_message_page, mark_read, record_messages,
+    serialize_message,
+)
 from django.utils import timezone
 
+logger = logging.getLogger('campusfit.chat')
+
+# Write-behind settings: messages are broadcast immediately and persisted in
+# batches once this many are queued or after this many seconds. A batch size
+# of 1 writes every message straight away.
+FLUSH_BATCH_SIZE = getattr(settings, 'CHAT_FLUSH_BATCH_SIZE', 20)
+FLUSH_INTERVAL = getattr(settings, 'CHAT_FLUSH_INTERVAL', 1.0)
+
+# Compact-protocol clients get live messages coalesced into one frame per
+# COALESCE_SECONDS, or sooner once COALESCE_MAX messages are waiting.
+COALESCE_SECONDS = getattr(settings, 'CHAT_COALESCE_SECONDS', 0.05)
+COALESCE_MAX = 50
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.booking_id = self.scope['url_route']['kwargs']['booking_id']
         self.room_group_name = f'chat_{self.booking_id}'
+        self.user = self.scope['user']
+        self.pending_messages = []
+        self.flush_handle = None
+        self.outbox = []
+        self.outbox_handle = None
+        # Flushes started from timers; kept so they aren't garbage collected
+        # mid-write and so disconnect can wait for them.
+        self.background = set()
+
+        # Resolve the booking and both participants once per connection.
+        self.booking = await self.get_booking()
+        if self.booking is None or self.user not in (self.booking.learner.user, self.booking.mentor.user):
+            await self.close()
+            return
+        if self.user == self.booking.learner.user:
+            self.receiver = self.booking.mentor.user
+        else:
+            self.receiver = self.booking.learner.user
 
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
-        await self.accept()
+        subprotocols = self.scope.get('subprotocols', [])
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        self.compact = COMPACT_PROTOCOL in subprotocols or query.get('compact') == ['1']
+        await self.accept(COMPACT_PROTOCOL if COMPACT_PROTOCOL in subprotocols else None)
+        if self.compact:
+            participants = (self.booking.learner.user, self.booking.mentor.user)
+            await self.send(text_data=dumps_compact({
+                't': 'hello',
+                'me': self.user.id,
+                'users': {str(user.id): user.full_name for user in participants},
+            }))
 
     async def disconnect(self, close_code):
+        if self.outbox_handle is not None:
+            self.outbox_handle.cancel()
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        if self.background:
+            await asyncio.gather(*self.background)
+        await self.flush_messages(retry=False)
+        if getattr(self, 'booking', None) is not None:
+            # Everything delivered while connected has been seen.
+            await self.mark_read()
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
@@ -23,11 +85,20 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         text_data_json = json.loads(text_data)
+        if text_data_json.get('type') == 'history':
+            await self.send_history(text_data_json.get('before'))
+            return
         message = text_data_json['message']
-        receiver_id = text_data_json['receiver_id']
-        sender = self.scope['user']
+        sender = self.user
+        now = timezone.now()
 
-        await self.save_message(sender, receiver_id, message)
+        self.pending_messages.append(Message(
+            booking=self.booking,
+            sender=sender,
+            receiver=self.receiver,
+            content=message,
+            timestamp=now,
+        ))
 
         # FIX: Added 'sender_id' here
         await self.channel_layer.group_send(
@@ -37,11 +108,24 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'message': message,
                 'sender_name': sender.full_name,
                 'sender_id': sender.id,  # <--- NEW
-                'timestamp': timezone.now().strftime('%I:%M %p')
+                'timestamp': timezone.localtime(now).strftime('%I:%M %p'),
+                'sent_at': now.timestamp(),
             }
         )
 
+        if len(self.pending_messages) >= FLUSH_BATCH_SIZE:
+            await self.flush_messages()
+        elif self.flush_handle is None:
+            self.flush_handle = self.call_later(FLUSH_INTERVAL, self.flush_messages)
+
     async def chat_message(self, event):
+        if self.compact:
+            self.outbox.append([event['sender_id'], int(event['sent_at'] * 1000), event['message']])
+            if len(self.outbox) >= COALESCE_MAX:
+                await self.send_outbox()
+            elif self.outbox_handle is None:
+                self.outbox_handle = self.call_later(COALESCE_SECONDS, self.send_outbox)
+            return
         message = event['message']
         sender_name = event['sender_name']
         sender_id = event['sender_id'] # <--- NEW
@@ -55,13 +139,99 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'timestamp': timestamp
         }))
 
+    async def send_outbox(self):
+        if self.outbox_handle is not None:
+            self.outbox_handle.cancel()
+            self.outbox_handle = None
+        batch, self.outbox = self.outbox, []
+        if batch:
+            await self.send(text_data=dumps_compact({'t': 'm', 'm': batch}))
+
+    async def send_history(self, before):
+        try:
+            before = int(before)
+        except (TypeError, ValueError):
+            return
+        page, has_more = await self.get_history(before)
+        if self.compact:
+            await self.send(text_data=dumps_compact(compact_history(page, has_more)))
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'history',
+            'messages': [serialize_message(m) for m in page],
+            'has_more': has_more,
+        }))
+
+    def call_later(self, delay, method):
+        def start():
+            task = asyncio.ensure_future(method())
+            self.background.add(task)
+            task.add_done_callback(self.background.discard)
+        return asyncio.get_running_loop().call_later(delay, start)
+
+    async def flush_messages(self, retry=True):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending_messages = self.pending_messages, []
+        if not batch:
+            return
+        try:
+            await self.save_messages(batch)
+        except Exception:
+            # The messages were already broadcast, so don't drop them: put the
+            # batch back in front of anything queued since and try again later.
+            if not retry:
+                logger.exception("Lost %d chat messages of booking %s", len(batch), self.booking_id)
+                return
+            logger.exception("Saving %d chat messages of booking %s failed; retrying", len(batch), self.booking_id)
+            for message in batch:
+                message.pk = None
+                message._state.adding = True
+            self.pending_messages[:0] = batch
+            if self.flush_handle is None:
+                self.flush_handle = self.call_later(FLUSH_INTERVAL, self.flush_messages)
+
     @database_sync_to_async
-    def save_message(self, sender, receiver_id, message):
-        receiver = User.objects.get(id=receiver_id)
-        booking = Booking.objects.get(id=self.booking_id)
-        Message.objects.create(
-            booking=booking,
-            sender=sender,
-            receiver=receiver,
-            content=message
-        )
\ No newline at end of file
+    def get_booking(self):
+        return Booking.objects.select_related('learner__user', 'mentor__user').filter(id=self.booking_id).first()
+
+    @database_sync_to_async
+    def get_history(self, before):
+        return get_message_page(self.booking, before=before)
+
+    @database_sync_to_async
+    def save_messages(self, batch):
+        with transaction.atomic():
+            Message.objects.bulk_create(batch)
+            record_messages(batch)
+
+    @database_sync_to_async
+    def mark_read(self):
+        mark_read(self.user, self.booking)
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """Per-user push channel; the reminder worker sends to the user's notify group."""
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = notify_group(self.user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if getattr(self, 'group_name', None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def session_reminder(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'reminder',
+            'booking': event['booking'],
+            'with': event['with'],
+            'minutes': event['minutes'],
+            'chat_url': reverse('chat', args=[event['booking']]),
+        }))
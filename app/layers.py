@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    expires REAL NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS channel_messages_owner ON channel_messages (owner, id);
+CREATE INDEX IF NOT EXISTS channel_messages_channel ON channel_messages (channel, expires);
+CREATE TABLE IF NOT EXISTS channel_groups (
+    grp TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (grp, channel)
+);
+"""
+
+
+class SQLiteChannelLayer(BaseChannelLayer):
+    """
+    Channel layer backed by a shared SQLite file, so several daphne processes
+    on one host can exchange messages and share groups without Redis.
+
+        CHANNEL_LAYERS = {
+            "default": {
+                "BACKEND": "app.layers.SQLiteChannelLayer",
+                "CONFIG": {"path": BASE_DIR / "channels.sqlite3"},
+            }
+        }
+
+    Messages are stored as JSON rows. Each process runs one poller that
+    collects messages for all of its process-specific channels ("...!xyz")
+    and hands them to per-channel queues; the poll interval backs off from
+    poll_interval to max_poll_interval while the layer is idle.
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        path,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        poll_interval=0.005,
+        max_poll_interval=0.05,
+        cleanup_interval=30,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.path = str(path)
+        self.group_expiry = group_expiry
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.cleanup_interval = cleanup_interval
+        self.client_prefix = uuid.uuid4().hex
+        self._local = threading.local()
+        self._queues = {}
+        self._poller = None
+        self._last_cleanup = 0.0
+
+    # --- SQLite access (runs in worker threads) ---
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._local.db = db
+        return db
+
+    @contextlib.contextmanager
+    def _write(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _run(self, func, *args):
+        return asyncio.to_thread(func, *args)
+
+    def _insert(self, db, channel, body, now):
+        count = db.execute(
+            "SELECT COUNT(*) FROM channel_messages WHERE channel = ? AND expires > ?", (channel, now)
+        ).fetchone()[0]
+        if count >= self.get_capacity(channel):
+            return False
+        db.execute(
+            "INSERT INTO channel_messages (owner, channel, expires, body) VALUES (?, ?, ?, ?)",
+            (self.non_local_name(channel), channel, now + self.expiry, body),
+        )
+        return True
+
+    def _send(self, channel, body):
+        with self._write() as db:
+            return self._insert(db, channel, body, time.time())
+
+    def _fetch(self, owners, limit=100):
+        db = self._db()
+        placeholders = ','.join('?' * len(owners))
+        query = (
+            f"SELECT id, channel, body FROM channel_messages WHERE owner IN ({placeholders}) "
+            f"AND expires > ? ORDER BY id LIMIT {int(limit)}"
+        )
+        # Idle polls are plain WAL reads; only take the write lock when there is something to claim.
+        if not db.execute(query, (*owners, time.time())).fetchone():
+            return []
+        with self._write():
+            rows = db.execute(query, (*owners, time.time())).fetchall()
+            db.executemany("DELETE FROM channel_messages WHERE id = ?", [(row[0],) for row in rows])
+        return [(channel, body) for _, channel, body in rows]
+
+    def _group_add(self, group, channel):
+        self._db().execute(
+            "INSERT OR REPLACE INTO channel_groups (grp, channel, expires) VALUES (?, ?, ?)",
+            (group, channel, time.time() + self.group_expiry),
+        )
+
+    def _group_discard(self, group, channel):
+        self._db().execute("DELETE FROM channel_groups WHERE grp = ? AND channel = ?", (group, channel))
+
+    def _group_send(self, group, body):
+        now = time.time()
+        with self._write() as db:
+            channels = [row[0] for row in db.execute(
+                "SELECT channel FROM channel_groups WHERE grp = ? AND expires > ?", (group, now)
+            )]
+            for channel in channels:
+                # Full channels are skipped, as with the other group-capable layers.
+                self._insert(db, channel, body, now)
+
+    def _cleanup(self):
+        db = self._db()
+        now = time.time()
+        db.execute("DELETE FROM channel_messages WHERE expires <= ?", (now,))
+        db.execute("DELETE FROM channel_groups WHERE expires <= ?", (now,))
+
+    def _flush(self):
+        db = self._db()
+        db.execute("DELETE FROM channel_messages")
+        db.execute("DELETE FROM channel_groups")
+
+    # --- Channel layer API ---
+
+    async def new_channel(self, prefix="specific"):
+        return f"{prefix}.{self.client_prefix}!{uuid.uuid4().hex}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+        if not await self._run(self._send, channel, json.dumps(message)):
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        if "!" not in channel:
+            return await self._receive_shared(channel)
+        queue = self._queues.setdefault(channel, asyncio.Queue())
+        self._ensure_poller()
+        try:
+            return await queue.get()
+        except asyncio.CancelledError:
+            if queue.empty():
+                self._queues.pop(channel, None)
+            raise
+
+    async def _receive_shared(self, channel):
+        delay = self.poll_interval
+        while True:
+            rows = await self._run(self._fetch, [channel], 1)
+            if rows:
+                return json.loads(rows[0][1])
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+            self._poller = loop.create_task(self._poll_local())
+
+    async def _poll_local(self):
+        delay = self.poll_interval
+        while self._queues:
+            owners = sorted({self.non_local_name(channel) for channel in self._queues})
+            rows = await self._run(self._fetch, owners)
+            for channel, body in rows:
+                self._queues.setdefault(channel, asyncio.Queue()).put_nowait(json.loads(body))
+            if time.monotonic() - self._last_cleanup > self.cleanup_interval:
+                self._last_cleanup = time.monotonic()
+                await self._run(self._cleanup)
+            if rows:
+                delay = self.poll_interval
+            else:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_poll_interval)
+
+    async def flush(self):
+        self._queues.clear()
+        await self._run(self._flush)
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._run(self._group_add, group, channel)
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        await self._run(self._group_discard, group, channel)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        await self._run(self._group_send, group, json.dumps(message))
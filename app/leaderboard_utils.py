@@ -0,0 +1,104 @@
+import threading
+import time
+from sortedcontainers import SortedList
+
+from .models import Mentor
+
+# Awards made in other worker processes only reach this process on reload.
+RELOAD_SECONDS = 60
+
+
+class Leaderboard:
+    """
+    Approved mentors ranked by points, kept in memory.
+
+    Ranks are stored as a SortedList of (-points, mentor_id) keys, so a
+    points change, insert or rank lookup is O(log n), and top-N is a slice.
+    The mentor instances (with their user) are kept alongside so pages can be
+    rendered without touching the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = SortedList()
+        self._mentors = {}
+        self._loaded_at = None
+
+    def load(self):
+        mentors = list(Mentor.objects.filter(status='approved').select_related('user'))
+        with self._lock:
+            self._mentors = {m.pk: m for m in mentors}
+            self._keys = SortedList((-m.points, m.pk) for m in mentors)
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > RELOAD_SECONDS:
+            self.load()
+
+    def _discard_key(self, mentor):
+        self._keys.discard((-mentor.points, mentor.pk))
+
+    def top(self, n=None):
+        with self._lock:
+            self._ensure_loaded()
+            keys = self._keys if n is None else self._keys[:n]
+            return [self._mentors[pk] for _, pk in keys]
+
+    def page(self, after=None, n=20):
+        """
+        Keyset page of the ranking: up to n mentors ranked after the
+        (points, mentor_id) cursor, and the cursor for the next page or None.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            start = 0 if after is None else self._keys.bisect_right((-after[0], after[1]))
+            keys = self._keys[start:start + n]
+            more = start + n < len(self._keys)
+            mentors = [self._mentors[pk] for _, pk in keys]
+        next_cursor = (-keys[-1][0], keys[-1][1]) if keys and more else None
+        return mentors, next_cursor
+
+    def rank(self, mentor_id):
+        """1-based rank of an approved mentor, or None if not on the board."""
+        with self._lock:
+            self._ensure_loaded()
+            mentor = self._mentors.get(mentor_id)
+            if mentor is None:
+                return None
+            return self._keys.bisect_left((-mentor.points, mentor.pk)) + 1
+
+    def set_points(self, mentor_id, points):
+        with self._lock:
+            mentor = self._mentors.get(mentor_id)
+            if mentor is None:
+                return
+            self._discard_key(mentor)
+            mentor.points = points
+            self._keys.add((-points, mentor_id))
+
+    def upsert(self, mentor):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            current = self._mentors.get(mentor.pk)
+            if current is not None:
+                self._discard_key(current)
+                if not Mentor.user.is_cached(mentor) and Mentor.user.is_cached(current):
+                    mentor.user = current.user
+            self._mentors[mentor.pk] = mentor
+            self._keys.add((-mentor.points, mentor.pk))
+
+    def remove(self, mentor_id):
+        with self._lock:
+            mentor = self._mentors.pop(mentor_id, None)
+            if mentor is not None:
+                self._discard_key(mentor)
+
+    def rename(self, user):
+        with self._lock:
+            mentor = self._mentors.get(user.pk)
+            if mentor is not None:
+                mentor.user = user
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.archive_utils import ARCHIVE_AFTER_DAYS, archive_messages, restore_messages
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the chat messages of bookings that ended more than --days ago into compressed "
+        "per-booking archives, which the chat page reads transparently. --restore moves them back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=200, help="Bookings moved per transaction.")
+        parser.add_argument('--restore', action='store_true', help="Move archived messages back into the Message table.")
+        parser.add_argument('--booking', type=int, nargs='*', help="With --restore, only these bookings.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['restore']:
+            restored = restore_messages(
+                booking_ids=options['booking'], batch_size=options['batch_size'],
+                progress=lambda n: self.stdout.write(f"  {n} messages restored"),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Restored {restored} messages in {time.perf_counter() - started:.2f}s."
+            ))
+            return
+        try:
+            bookings, messages = archive_messages(
+                days=options['days'], batch_size=options['batch_size'],
+                progress=lambda b, m: self.stdout.write(f"  {b} bookings, {m} messages archived"),
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {messages} messages from {bookings} bookings in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,73 @@
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from .bench_views import Command as BenchViewsCommand, percentile
+
+ASYNC_PAGES = ['learner_dash', 'booking (learner)', 'booking (mentor)', 'mentor_dash', 'progress_tracker', 'leaderboard']
+
+
+class Command(BenchViewsCommand):
+    help = (
+        "Starts daphne with the sync views and then with the async views (CAMPUSFIT_ASYNC_VIEWS=1) "
+        "and compares throughput and latency of the dashboard, bookings, progress and leaderboard "
+        "pages at several concurrency levels."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per page and concurrency level.")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--pages', nargs='*', default=ASYNC_PAGES)
+
+    def handle(self, *args, **options):
+        pages = self.get_pages(options['pages'])
+        base_url = f"http://127.0.0.1:{options['port']}"
+        self.stdout.write(
+            f"{'views':<7}{'page':<20}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}"
+        )
+        for mode in ('sync', 'async'):
+            with self.daphne(options['port'], async_views=mode == 'async'):
+                for name, user, path in pages:
+                    fetch = self.make_fetcher(user, path, base_url)
+                    for _ in range(options['warmup']):
+                        fetch()
+                    for concurrency in options['concurrency']:
+                        throughput, latencies, errors = self.run(fetch, options['requests'], concurrency)
+                        self.stdout.write(
+                            f"{mode:<7}{name:<20}{concurrency:>6}{throughput:>10.1f}"
+                            f"{percentile(latencies, 50) * 1000:>10.1f}{percentile(latencies, 95) * 1000:>10.1f}"
+                            f"{errors:>8}"
+                        )
+
+    @contextlib.contextmanager
+    def daphne(self, port, async_views):
+        env = {**os.environ, 'CAMPUSFIT_ASYNC_VIEWS': '1' if async_views else '0'}
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'daphne', '-b', '127.0.0.1', '-p', str(port), 'campusfit.asgi:application'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    with socket.create_connection(('127.0.0.1', port), timeout=1):
+                        break
+                except OSError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise CommandError(f"daphne did not start on port {port}.")
+                    time.sleep(0.2)
+            # One request so the first measured page doesn't pay for app loading.
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/").read()
+            yield process
+        finally:
+            process.terminate()
+            process.wait(10)
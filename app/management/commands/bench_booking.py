@@ -0,0 +1,100 @@
+import math
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from app.booking_utils import SlotUnavailable, create_booking
+from app.models import Booking, Learner, Mentor, User
+
+
+def naive_booking(learner, mentor, session_start, duration=30):
+    # The pre-transaction check-then-insert path, kept for comparison.
+    session_end = session_start + timedelta(minutes=duration)
+    if Booking.objects.filter(mentor=mentor, session_date__lt=session_end, end_time__gt=session_start).exists():
+        raise SlotUnavailable
+    return Booking.objects.create(learner=learner, mentor=mentor, session_date=session_start, duration=duration)
+
+
+def count_double_bookings(mentor):
+    overlaps, last_end = 0, None
+    for start, end in Booking.objects.filter(mentor=mentor).order_by('session_date').values_list('session_date', 'end_time'):
+        if last_end is not None and start < last_end:
+            overlaps += 1
+        last_end = end if last_end is None else max(last_end, end)
+    return overlaps
+
+
+class Command(BaseCommand):
+    help = "Fires concurrent booking attempts at one mentor and reports throughput, p99 latency and double bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=50, help="Concurrent booking attempts (one thread each).")
+        parser.add_argument('--slots', type=int, default=1, help="Distinct 30-minute slots the attempts compete for.")
+        parser.add_argument('--mode', choices=['locked', 'naive'], default='locked')
+        parser.add_argument('--keep', action='store_true', help="Keep the generated benchmark rows.")
+
+    def handle(self, *args, **options):
+        attempts, slots = options['attempts'], options['slots']
+        book = create_booking if options['mode'] == 'locked' else naive_booking
+        tag = uuid.uuid4().hex[:8]
+
+        mentor_user = User.objects.create(username=f'bench-{tag}-mentor@college.edu', full_name='Bench Mentor', role='mentor')
+        mentor = Mentor.objects.create(
+            user=mentor_user, specialization='Benchmark', experience=1, bio='', application_text='',
+            form_check_video_url='https://example.com', status='approved',
+        )
+        learners = []
+        for i in range(attempts):
+            user = User.objects.create(username=f'bench-{tag}-{i}@college.edu', full_name=f'Bench Learner {i}', role='learner')
+            learners.append(Learner.objects.create(user=user, goal='stamina'))
+        first_slot = (timezone.now() + timedelta(days=30)).replace(second=0, microsecond=0)
+        # Threads open their own connections; release ours so SQLite isn't held.
+        connection.close()
+
+        barrier = threading.Barrier(attempts)
+        latencies, outcomes, lock = [], {'booked': 0, 'conflict': 0, 'error': 0}, threading.Lock()
+
+        def attempt(i):
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                book(learners[i], mentor, first_slot + timedelta(minutes=30 * (i % slots)))
+                outcome = 'booked'
+            except SlotUnavailable:
+                outcome = 'conflict'
+            except Exception:
+                outcome = 'error'
+            finally:
+                close_old_connections()
+                connection.close()
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+
+        threads = [threading.Thread(target=attempt, args=(i,)) for i in range(attempts)]
+        wall_start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - wall_start
+
+        latencies.sort()
+        p99 = latencies[max(0, math.ceil(0.99 * len(latencies)) - 1)]
+        double_bookings = count_double_bookings(mentor)
+        self.stdout.write(
+            f"mode={options['mode']} attempts={attempts} slots={slots} db={connection.vendor}\n"
+            f"booked={outcomes['booked']} conflicts={outcomes['conflict']} errors={outcomes['error']}\n"
+            f"throughput={attempts / wall:.1f} attempts/s p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+            f"p99={p99 * 1000:.1f}ms\n"
+            f"double_bookings={double_bookings}"
+        )
+
+        if not options['keep']:
+            User.objects.filter(username__startswith=f'bench-{tag}-').delete()
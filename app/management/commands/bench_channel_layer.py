@@ -0,0 +1,52 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from channels.layers import InMemoryChannelLayer
+from django.core.management.base import BaseCommand
+
+from app.layers import SQLiteChannelLayer
+
+
+async def run_fanout(layer, messages, members):
+    channels = [await layer.new_channel() for _ in range(members)]
+    for channel in channels:
+        await layer.group_add('bench', channel)
+    latencies = []
+
+    async def consume(channel):
+        for _ in range(messages):
+            message = await layer.receive(channel)
+            latencies.append(time.perf_counter() - message['sent'])
+
+    consumers = [asyncio.create_task(consume(channel)) for channel in channels]
+    started = time.perf_counter()
+    for _ in range(messages):
+        await layer.group_send('bench', {'type': 'bench.message', 'sent': time.perf_counter()})
+        # Yield so consumers drain and the per-channel capacity isn't hit.
+        await asyncio.sleep(0)
+    await asyncio.gather(*consumers)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return messages * members / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+class Command(BaseCommand):
+    help = "Compares group_send throughput and delivery latency of the in-memory and SQLite channel layers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1000)
+        parser.add_argument('--members', type=int, default=2, help="Channels in the group (2 for a chat room).")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            layers = {
+                'in-memory': InMemoryChannelLayer(capacity=10000),
+                'sqlite': SQLiteChannelLayer(Path(tmp) / 'channels.sqlite3', capacity=10000),
+            }
+            for name, layer in layers.items():
+                throughput, p50, p99 = asyncio.run(run_fanout(layer, options['messages'], options['members']))
+                self.stdout.write(
+                    f"{name:>10}: {throughput:,.0f} deliveries/s  p50={p50 * 1000:.2f}ms  p99={p99 * 1000:.2f}ms"
+                )
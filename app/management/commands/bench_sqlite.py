@@ -0,0 +1,152 @@
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+from app.models import Booking, Message
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+class Profile:
+    """
+    A database alias on a copy of the database, used through Django's own
+    connection handling the way a request uses it under daphne: each
+    operation opens a connection (running the profile's init_command) and
+    closes it when done, as request_finished does.
+    """
+
+    def __init__(self, name, path, pragmas):
+        self.name = name
+        self.path = path
+        self.pragmas = pragmas
+        options = {key: value for key, value in settings.DATABASES['default']['OPTIONS'].items() if key != 'init_command'}
+        if pragmas:
+            options['init_command'] = '; '.join(f'PRAGMA {pragma}={value}' for pragma, value in pragmas.items())
+        self.connections = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path), 'OPTIONS': options},
+        })
+
+    def prepare(self):
+        db = sqlite3.connect(self.path, isolation_level=None)
+        db.execute(f"PRAGMA journal_mode={self.pragmas.get('journal_mode', 'DELETE')}")
+        db.close()
+
+    @contextmanager
+    def connection(self):
+        connection = self.connections['default']
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures concurrent read/write throughput of the chat and bookings queries on a copy of the "
+        "database, with the default SQLite settings (rollback journal) and with the production profile "
+        "(WAL, tuned pragmas), opening a connection per operation through Django like a request does."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--batch', type=int, default=5, help="Messages inserted per write transaction.")
+
+    def handle(self, *args, **options):
+        bookings = list(Booking.objects.values_list('pk', 'learner_id', 'mentor_id')[:5000])
+        if not bookings:
+            raise CommandError("No bookings found; run `manage.py seed_data` first.")
+        source = sqlite3.connect(settings.DATABASES['default']['NAME'])
+
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, {options['seconds']:.0f}s each\n"
+            f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'read p95':>11}{'write p95':>11}{'errors':>8}"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in (
+                Profile('default', Path(tmp) / 'default.sqlite3', {}),
+                Profile('production', Path(tmp) / 'production.sqlite3', settings.SQLITE_TUNED_PRAGMAS),
+            ):
+                with sqlite3.connect(profile.path) as copy:
+                    source.backup(copy)
+                profile.prepare()
+                reads, writes, errors = self.run(profile, bookings, options)
+                elapsed = options['seconds']
+                self.stdout.write(
+                    f"{profile.name:<12}{len(reads) / elapsed:>10.0f}{len(writes) / elapsed:>10.0f}"
+                    f"{percentile(reads, 95) * 1000:>9.1f}ms{percentile(writes, 95) * 1000:>9.1f}ms{errors[0]:>8}"
+                )
+        source.close()
+
+    def run(self, profile, bookings, options):
+        message_table, booking_table = Message._meta.db_table, Booking._meta.db_table
+        reads, writes, errors, lock = [], [], [0], threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def read():
+            booking_id, learner_id, _ = random.choice(bookings)
+            with profile.connection() as connection, connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT id, content, sender_id, timestamp FROM {message_table} WHERE booking_id = %s "
+                    f"ORDER BY timestamp DESC, id DESC LIMIT 50", [booking_id]
+                )
+                cursor.fetchall()
+                cursor.execute(
+                    f"SELECT id, mentor_id, session_date, status FROM {booking_table} WHERE learner_id = %s "
+                    f"ORDER BY session_date", [learner_id]
+                )
+                cursor.fetchall()
+
+        def write():
+            booking_id, learner_id, mentor_id = random.choice(bookings)
+            # transaction.atomic() only knows the project's aliases, so the
+            # transaction is spelled out, as the IMMEDIATE transaction_mode does it.
+            with profile.connection() as connection, connection.cursor() as cursor:
+                cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor.executemany(
+                        f"INSERT INTO {message_table} (booking_id, sender_id, receiver_id, content, timestamp) "
+                        f"VALUES (%s, %s, %s, %s, datetime('now'))",
+                        [(booking_id, learner_id, mentor_id, "bench message")] * options['batch'],
+                    )
+                except OperationalError:
+                    cursor.execute("ROLLBACK")
+                    raise
+                cursor.execute("COMMIT")
+
+        def worker(operation, samples):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    operation()
+                except OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    samples.append(elapsed)
+
+        threads = (
+            [threading.Thread(target=worker, args=(read, reads)) for _ in range(options['readers'])]
+            + [threading.Thread(target=worker, args=(write, writes)) for _ in range(options['writers'])]
+        )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reads.sort()
+        writes.sort()
+        return reads, writes, errors
@@ -0,0 +1,126 @@
+import math
+import threading
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from app.models import Booking, Learner, Mentor
+
+
+def percentile(ordered, pct):
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the learner dashboard, bookings, leaderboard, mentor profiles and chat pages "
+        "and reports throughput and latency percentiles. Runs in-process by default, or against a "
+        "running server with --base-url. Use seed_data first for realistic volumes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per page.")
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--base-url', help="e.g. http://127.0.0.1:8000 to benchmark over HTTP.")
+        parser.add_argument('--pages', nargs='*', help="Limit to these page names.")
+
+    def handle(self, *args, **options):
+        pages = self.get_pages(options['pages'])
+        self.stdout.write(f"{'page':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name, user, path in pages:
+            fetch = self.make_fetcher(user, path, options['base_url'])
+            for _ in range(options['warmup']):
+                fetch()
+            throughput, latencies, errors = self.run(fetch, options['requests'], options['concurrency'])
+            self.stdout.write(
+                f"{name:<20}{throughput:>10.1f}{percentile(latencies, 50) * 1000:>10.1f}"
+                f"{percentile(latencies, 95) * 1000:>10.1f}{percentile(latencies, 99) * 1000:>10.1f}{errors:>8}"
+            )
+
+    def get_pages(self, names=None):
+        """(name, user, path) for each benchmarked page, optionally limited to the given names."""
+        # Pick the busiest learner, mentor and chat so the pages render real volumes.
+        busiest_learner = Booking.objects.values('learner').annotate(n=Count('id')).order_by('-n').first()
+        busiest_mentor = Booking.objects.values('mentor').annotate(n=Count('id')).order_by('-n').first()
+        if busiest_learner is None:
+            raise CommandError("No bookings found; run `manage.py seed_data` first.")
+        learner = Learner.objects.select_related('user').get(pk=busiest_learner['learner'])
+        mentor = Mentor.objects.select_related('user').get(pk=busiest_mentor['mentor'])
+        booking = Booking.objects.filter(learner=learner).annotate(n=Count('message')).order_by('-n').first()
+
+        pages = [
+            ('learner_dash', learner.user, reverse('learner_dash')),
+            ('booking (learner)', learner.user, reverse('booking')),
+            ('booking (mentor)', mentor.user, reverse('booking')),
+            ('mentor_dash', mentor.user, reverse('mentor_dash')),
+            ('progress_tracker', learner.user, reverse('progress_tracker')),
+            ('leaderboard', learner.user, reverse('leaderboard')),
+            ('mentor_profiles', learner.user, reverse('mentor_profiles')),
+            ('chat', learner.user, reverse('chat', args=[booking.pk])),
+        ]
+        if names:
+            pages = [page for page in pages if page[0] in names]
+        return pages
+
+    def make_fetcher(self, user, path, base_url):
+        if not base_url:
+            # The test Client isn't thread-safe, so each thread logs in its own.
+            local = threading.local()
+
+            def fetch():
+                if not hasattr(local, 'client'):
+                    local.client = Client()
+                    local.client.force_login(user)
+                return local.client.get(path).status_code
+
+            return fetch
+
+        # force_login stores a real session, so its cookie works against a live server too.
+        client = Client()
+        client.force_login(user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        url = base_url.rstrip('/') + path
+
+        def fetch():
+            request = urllib.request.Request(url, headers={'Cookie': cookie})
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+
+        return fetch
+
+    def run(self, fetch, total, concurrency):
+        latencies, errors, lock = [], [0], threading.Lock()
+        remaining = iter(range(total))
+
+        def worker():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                try:
+                    ok = fetch() == 200
+                except Exception:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if not ok:
+                        errors[0] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return total / elapsed, latencies, errors[0]
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.recommendation_utils import ARTIFACT_PATH, approved_mentors, fit_index, save_artifact
+
+
+class Command(BaseCommand):
+    help = (
+        "Fits the mentor recommendation model offline and saves it with joblib, so workers "
+        "memory-map it instead of fitting. Re-run periodically to pick up new vocabulary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(ARTIFACT_PATH))
+
+    def handle(self, *args, **options):
+        mentors = approved_mentors()
+        if not mentors:
+            raise CommandError("There are no approved mentors to index.")
+        started = time.perf_counter()
+        state = fit_index(mentors)
+        save_artifact(state, options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(mentors)} mentors ({len(state['vectorizer'].vocabulary_)} terms) "
+            f"in {time.perf_counter() - started:.2f}s -> {options['output']}"
+        ))
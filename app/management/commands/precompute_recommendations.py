@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.recommendation_utils import TOP_K, precompute_learner_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the top-k mentor recommendations for every learner in chunked sparse matrix "
+        "products and stores them in the MentorRecommendation table read by the dashboard. "
+        "Any mentor change clears the table, so schedule it (e.g. nightly) to keep it in use."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Learners scored per matrix product.")
+        parser.add_argument('--top-k', type=int, default=TOP_K)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        processed = precompute_learner_recommendations(
+            chunk_size=options['chunk_size'],
+            top_k=options['top_k'],
+            progress=lambda n: self.stdout.write(f"  {n} learners done"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored recommendations for {processed} learners in {time.perf_counter() - started:.2f}s."
+        ))
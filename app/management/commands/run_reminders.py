@@ -0,0 +1,19 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from app.reminder_utils import REMINDER_LEAD, run_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the session reminder worker: keeps the upcoming bookings in a min-heap and notifies "
+        "both participants over the channel layer shortly before each session. Run one per deployment."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Sending reminders {REMINDER_LEAD.total_seconds() / 60:.0f} minutes before sessions.")
+        try:
+            asyncio.run(run_reminders(log=self.stdout.write))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,184 @@
+import random
+from itertools import accumulate
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Booking, DietPlan, Learner, Mentor, Message, User
+from app.chat_utils import backfill_read_states
+from app.search_utils import rebuild_mentor_search
+
+PREFIX = 'seed-'
+SPECIALIZATIONS = [
+    ('Strength & Hypertrophy', "Muscle building, hypertrophy and progressive overload for beginners and lifters."),
+    ('Fat Loss & HIIT', "High intensity interval training, cardio and diet coaching for weight loss."),
+    ('Endurance Running', "Stamina, aerobic base building and race preparation for runners."),
+    ('Yoga & Mobility', "Flexibility, yoga flows, stretching and balance work."),
+    ('Sports Conditioning', "Agility, speed and athletic performance for competitive sport."),
+    ('Injury Rehab', "Safe low impact rehabilitation and physiotherapy-guided recovery."),
+]
+GOAL_WEIGHTS = [
+    ('weight_loss', 30), ('muscle_gain', 30), ('stamina', 15),
+    ('flexibility', 10), ('sports', 10), ('rehabilitation', 5),
+]
+CHAT_LINES = [
+    "Hi! Looking forward to our session.", "Should I bring anything?", "Let's focus on form today.",
+    "How did the last workout feel?", "Remember to warm up for 10 minutes.", "Great progress this week!",
+    "Can we move to the gym near the library?", "Thanks, see you then!",
+]
+SLOT = timedelta(minutes=30)
+SLOTS_PER_DAY = 32  # 06:00 to 22:00
+
+
+class Command(BaseCommand):
+    help = "Generates synthetic users, mentors, bookings, messages and diet plans for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--learners', type=int, default=1000)
+        parser.add_argument('--mentors', type=int, default=100)
+        parser.add_argument('--bookings', type=int, default=10000)
+        parser.add_argument('--messages', type=int, default=20000)
+        parser.add_argument('--diet-plans', type=int, default=3, help="Diet plans per goal.")
+        parser.add_argument('--past-days', type=int, default=180)
+        parser.add_argument('--future-days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded rows first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        if options['clear']:
+            User.objects.filter(username__startswith=PREFIX).delete()
+            DietPlan.objects.filter(title__startswith='Seed ').delete()
+
+        mentor_ids = self.create_mentors(options['mentors'])
+        # bulk_create skips the signals that keep the search index in sync.
+        rebuild_mentor_search()
+        learner_ids = self.create_learners(options['learners'])
+        self.stdout.write(f"Created {len(mentor_ids)} mentors and {len(learner_ids)} learners.")
+        first_booking_id = (Booking.objects.order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+        created = self.create_bookings(options['bookings'], learner_ids, mentor_ids, options['past_days'], options['future_days'])
+        self.stdout.write(f"Created {created} bookings.")
+        created = self.create_messages(options['messages'], first_booking_id)
+        self.stdout.write(f"Created {created} messages.")
+        backfill_read_states(Booking.objects.filter(pk__gte=first_booking_id))
+        self.create_diet_plans(options['diet_plans'])
+        self.stdout.write(self.style.SUCCESS("Seed data ready. Seeded users share the password 'campusfit-seed'."))
+
+    def create_users(self, role, count):
+        password = make_password('campusfit-seed')
+        start = User.objects.filter(username__startswith=f'{PREFIX}{role}-').count()
+        last_pk = User.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        users = [
+            User(username=f'{PREFIX}{role}-{i}@college.edu', email=f'{PREFIX}{role}-{i}@college.edu',
+                 full_name=f'{role.title()} {i}', role=role, password=password)
+            for i in range(start, start + count)
+        ]
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        # bulk_create doesn't return primary keys on every backend, so read them back.
+        return list(User.objects.filter(pk__gt=last_pk, username__startswith=f'{PREFIX}{role}-').values_list('pk', flat=True))
+
+    def create_mentors(self, count):
+        user_ids = self.create_users('mentor', count)
+        mentors = []
+        for user_id in user_ids:
+            specialization, bio = self.rng.choice(SPECIALIZATIONS)
+            mentors.append(Mentor(
+                user_id=user_id, specialization=specialization, bio=bio, experience=self.rng.randint(1, 6),
+                application_text="Seeded mentor application.", form_check_video_url='https://example.com/form-check',
+                has_first_aid_certification=self.rng.random() < 0.6, passed_safety_quiz=True,
+                status='approved' if self.rng.random() < 0.9 else self.rng.choice(['pending', 'rejected']),
+                # Long-tailed points: a few popular mentors, many with little activity.
+                points=int(self.rng.paretovariate(1.5) * 10) - 10,
+            ))
+        Mentor.objects.bulk_create(mentors, batch_size=self.batch_size)
+        return [m.user_id for m in mentors if m.status == 'approved']
+
+    def create_learners(self, count):
+        user_ids = self.create_users('learner', count)
+        goals, weights = zip(*GOAL_WEIGHTS)
+        Learner.objects.bulk_create([
+            Learner(user_id=user_id, roll_number=f'CF{user_id:06d}', goal=self.rng.choices(goals, weights)[0])
+            for user_id in user_ids
+        ], batch_size=self.batch_size)
+        return user_ids
+
+    def create_bookings(self, count, learner_ids, mentor_ids, past_days, future_days):
+        if not learner_ids or not mentor_ids:
+            return 0
+        now = timezone.now()
+        first_day = timezone.localtime(now).date() - timedelta(days=past_days)
+        total_slots = (past_days + future_days) * SLOTS_PER_DAY
+        count = min(count, total_slots * len(mentor_ids))
+        # Popular mentors get more sessions, following the same long tail as points.
+        cum_weights = list(accumulate(self.rng.paretovariate(1.2) for _ in mentor_ids))
+        mentor_indexes = range(len(mentor_ids))
+        taken = set()
+        created, batch = 0, []
+        while created + len(batch) < count:
+            mentor_index = self.rng.choices(mentor_indexes, cum_weights=cum_weights)[0]
+            slot = self.rng.randrange(total_slots)
+            if (mentor_index, slot) in taken:
+                continue
+            taken.add((mentor_index, slot))
+            day, slot_of_day = divmod(slot, SLOTS_PER_DAY)
+            start = timezone.make_aware(datetime.combine(first_day + timedelta(days=day), time(6))) + slot_of_day * SLOT
+            # Booking.save() isn't called by bulk_create, so end_time is set here.
+            booking = Booking(
+                learner_id=self.rng.choice(learner_ids), mentor_id=mentor_ids[mentor_index],
+                session_date=start, duration=30, end_time=start + SLOT,
+            )
+            if start + SLOT < now and self.rng.random() < 0.7:
+                booking.status = 'completed'
+                booking.points_awarded = self.rng.randint(1, 5)
+            batch.append(booking)
+            if len(batch) >= self.batch_size:
+                created += self.flush(Booking, batch)
+        return created + self.flush(Booking, batch)
+
+    def create_messages(self, count, first_booking_id):
+        booking_ids = list(Booking.objects.filter(pk__gte=first_booking_id).values_list('pk', flat=True))
+        if not booking_ids:
+            return 0
+        created, batch = 0, []
+        while created + len(batch) < count:
+            # Threads have a long tail too: most chats are short, a few are long.
+            sample = self.rng.sample(booking_ids, min(len(booking_ids), 500))
+            threads = Booking.objects.filter(pk__in=sample).values_list('pk', 'learner_id', 'mentor_id', 'session_date')
+            for booking_id, learner_id, mentor_id, session_date in threads:
+                length = min(int(self.rng.paretovariate(1.3) * 3), count - created - len(batch))
+                sent_at = session_date - timedelta(days=self.rng.randint(0, 3), minutes=self.rng.randint(0, 600))
+                for i in range(length):
+                    sender, receiver = (learner_id, mentor_id) if self.rng.random() < 0.5 else (mentor_id, learner_id)
+                    sent_at += timedelta(seconds=self.rng.randint(5, 3600))
+                    batch.append(Message(
+                        booking_id=booking_id, sender_id=sender, receiver_id=receiver,
+                        content=self.rng.choice(CHAT_LINES), timestamp=sent_at,
+                    ))
+                if len(batch) >= self.batch_size:
+                    created += self.flush(Message, batch)
+                if created + len(batch) >= count:
+                    break
+        return created + self.flush(Message, batch)
+
+    def create_diet_plans(self, per_goal):
+        plans = []
+        for goal, label in Learner.GOAL_CHOICES:
+            for i in range(per_goal):
+                plans.append(DietPlan(
+                    goal=goal, title=f'Seed {label} Plan {i + 1}',
+                    description=f"A sample {label.lower()} meal plan.",
+                    content="Breakfast: oats and eggs\nLunch: rice, dal and salad\nDinner: grilled paneer or chicken",
+                ))
+        DietPlan.objects.bulk_create(plans)
+
+    def flush(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,188 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger('campusfit.metrics')
+
+SAMPLES_PER_ROUTE = 1000
+
+_current_stats = contextvars.ContextVar('view_metrics', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _timed_render(render):
+    def wrapper(self, *args, **kwargs):
+        stats = _current_stats.get()
+        if stats is None:
+            return render(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            stats['template_time'] += time.perf_counter() - started
+    wrapper._view_metrics = True
+    return wrapper
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class RouteMetrics:
+    """Rolling per-route samples of query count, SQL, template and wall time."""
+
+    FIELDS = ('queries', 'sql_time', 'template_time', 'wall_time')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=SAMPLES_PER_ROUTE))
+
+    def record(self, route, stats):
+        with self._lock:
+            self._samples[route].append(tuple(stats[field] for field in self.FIELDS))
+
+    def summary(self):
+        with self._lock:
+            samples = {route: list(rows) for route, rows in self._samples.items()}
+        result = {}
+        for route, rows in samples.items():
+            result[route] = {'count': len(rows)}
+            for i, field in enumerate(self.FIELDS):
+                values = [row[i] for row in rows]
+                result[route][field] = {'p50': _percentile(values, 50), 'p95': _percentile(values, 95)}
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+route_metrics = RouteMetrics()
+
+
+class ViewMetricsMiddleware:
+    """
+    Records DB query count, SQL time, template render time and wall time for
+    every request, keyed by URL name, and checks VIEW_QUERY_BUDGETS.
+
+    A request over its route's budget logs a warning, or raises
+    QueryBudgetExceeded when VIEW_QUERY_BUDGET_STRICT is set (as in tests).
+    Template time is only measured with VIEW_METRICS_TEMPLATES on.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        if getattr(settings, 'VIEW_METRICS_TEMPLATES', False) and not getattr(Template.render, '_view_metrics', False):
+            Template.render = _timed_render(Template.render)
+
+    def _wrap_connections(self, stats):
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['queries'] += 1
+                stats['sql_time'] += time.perf_counter() - started
+
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(count_query))
+        return stack
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = {'queries': 0, 'sql_time': 0.0, 'template_time': 0.0, 'wall_time': 0.0}
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with self._wrap_connections(stats):
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        stats['wall_time'] = time.perf_counter() - started
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = {'queries': 0, 'sql_time': 0.0, 'template_time': 0.0, 'wall_time': 0.0}
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        # Connections are per thread, and the async ORM runs this request's
+        # queries on one worker thread, so wrap that thread's connections.
+        wrappers = await sync_to_async(self._wrap_connections)(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+            _current_stats.reset(token)
+        stats['wall_time'] = time.perf_counter() - started
+        return self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats):
+        match = request.resolver_match
+        route = match.url_name if match and match.url_name else None
+        if route is None:
+            return response
+        route_metrics.record(route, stats)
+        logger.debug(
+            "%s queries=%d sql=%.1fms template=%.1fms wall=%.1fms", route, stats['queries'],
+            stats['sql_time'] * 1000, stats['template_time'] * 1000, stats['wall_time'] * 1000,
+        )
+
+        budget = getattr(settings, 'VIEW_QUERY_BUDGETS', {}).get(route)
+        if budget is not None and stats['queries'] > budget:
+            message = f"View '{route}' ran {stats['queries']} queries (budget {budget})."
+            if getattr(settings, 'VIEW_QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can sit in an async middleware stack. WhiteNoise itself
+    is sync-only, which makes Django run every request's inner stack,
+    async views included, through a worker thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
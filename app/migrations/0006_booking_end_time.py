@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_end_time(apps, schema_editor):
+    Booking = apps.get_model('app', 'Booking')
+    batch = []
+    for booking in Booking.objects.only('id', 'session_date', 'duration').iterator(chunk_size=2000):
+        booking.end_time = booking.session_date + timedelta(minutes=booking.duration)
+        batch.append(booking)
+        if len(batch) >= 2000:
+            Booking.objects.bulk_update(batch, ['end_time'])
+            batch = []
+    if batch:
+        Booking.objects.bulk_update(batch, ['end_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='end_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_end_time, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='end_time',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['mentor', 'end_time'], name='booking_mentor_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['learner', 'end_time'], name='booking_learner_end_idx'),
+        ),
+    ]
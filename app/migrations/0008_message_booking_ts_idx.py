@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_message_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['booking', 'timestamp', 'id'], name='message_booking_ts_idx'),
+        ),
+    ]
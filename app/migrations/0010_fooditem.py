@@ -0,0 +1,74 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:55
+
+from django.db import migrations, models
+
+# (name, category, vegetarian, serving, calories, protein g, carbs g, fat g)
+FOODS = [
+    ("Paneer Tikka", 'protein', True, "100 g", 265, 18, 6, 20),
+    ("Lentil Soup (Dal)", 'protein', True, "1 cup", 230, 18, 40, 1),
+    ("Chickpea Salad", 'protein', True, "1 cup", 270, 15, 45, 4),
+    ("Greek Yogurt", 'protein', True, "200 g", 190, 20, 8, 8),
+    ("Tofu Stir-fry", 'protein', True, "150 g", 220, 20, 8, 12),
+    ("Soy Chunks", 'protein', True, "50 g dry", 170, 26, 17, 0.5),
+    ("Protein Shake", 'protein', True, "1 scoop with milk", 220, 30, 15, 5),
+    ("Grilled Chicken Breast", 'protein', False, "150 g", 250, 46, 0, 5),
+    ("Salmon/Fish", 'protein', False, "150 g", 310, 34, 0, 18),
+    ("Boiled Eggs", 'protein', False, "3 eggs", 210, 18, 1, 15),
+    ("Lean Turkey", 'protein', False, "150 g", 200, 40, 0, 4),
+    ("Chicken Curry (Light oil)", 'protein', False, "1 cup", 300, 32, 8, 15),
+    ("Tuna Salad", 'protein', False, "1 cup", 240, 30, 6, 10),
+    ("Brown Rice", 'carb', True, "1 cup cooked", 215, 5, 45, 2),
+    ("Oatmeal", 'carb', True, "1 cup cooked", 160, 6, 27, 3),
+    ("Sweet Potato", 'carb', True, "200 g", 180, 4, 41, 0.5),
+    ("Whole Wheat Roti", 'carb', True, "2 rotis", 240, 8, 44, 4),
+    ("Multigrain Bread", 'carb', True, "2 slices", 200, 8, 36, 3),
+    ("Almonds & Walnuts", 'fat', True, "30 g", 185, 5, 5, 17),
+    ("Olive Oil dressing", 'fat', True, "1 tbsp", 120, 0, 0, 14),
+    ("Avocado", 'fat', True, "half", 160, 2, 9, 15),
+    ("Peanut Butter", 'fat', True, "2 tbsp", 190, 8, 7, 16),
+    ("Chia Seeds", 'fat', True, "2 tbsp", 140, 5, 12, 9),
+    ("Apple", 'fruit', True, "1 medium", 95, 0.5, 25, 0.3),
+    ("Banana", 'fruit', True, "1 medium", 105, 1.3, 27, 0.4),
+    ("Berries", 'fruit', True, "1 cup", 85, 1, 21, 0.5),
+    ("Orange", 'fruit', True, "1 medium", 62, 1.2, 15, 0.2),
+    ("Papaya", 'fruit', True, "1 cup", 60, 0.7, 16, 0.4),
+    ("Spinach", 'veggie', True, "1 cup cooked", 40, 5, 7, 0.5),
+    ("Broccoli", 'veggie', True, "1 cup", 55, 4, 11, 0.6),
+    ("Mixed Veggies", 'veggie', True, "1 cup", 80, 3, 16, 0.5),
+    ("Cucumber Salad", 'veggie', True, "1 cup", 30, 1, 6, 0.2),
+    ("Steamed Beans", 'veggie', True, "1 cup", 45, 2.5, 10, 0.2),
+]
+
+
+def seed_food_catalog(apps, schema_editor):
+    FoodItem = apps.get_model('app', 'FoodItem')
+    FoodItem.objects.bulk_create([
+        FoodItem(name=name, category=category, vegetarian=vegetarian, serving=serving,
+                 calories=calories, protein=protein, carbs=carbs, fat=fat)
+        for name, category, vegetarian, serving, calories, protein, carbs, fat in FOODS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_mentorrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('category', models.CharField(choices=[('protein', 'Protein'), ('carb', 'Carb'), ('fat', 'Fat'), ('fruit', 'Fruit'), ('veggie', 'Vegetable')], max_length=10)),
+                ('vegetarian', models.BooleanField(default=True)),
+                ('serving', models.CharField(max_length=30)),
+                ('calories', models.FloatField()),
+                ('protein', models.FloatField(help_text='grams')),
+                ('carbs', models.FloatField(help_text='grams')),
+                ('fat', models.FloatField(help_text='grams')),
+            ],
+        ),
+        migrations.RunPython(seed_food_catalog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def create_mentor_search(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends use the LIKE fallback in search_utils.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Mentor = apps.get_model('app', 'Mentor')
+    User = apps.get_model('app', 'User')
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS mentor_search "
+        "USING fts5(name, specialization, bio, tokenize='porter unicode61')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO mentor_search (rowid, name, specialization, bio) "
+        f"SELECT m.user_id, u.full_name, m.specialization, m.bio FROM {Mentor._meta.db_table} m "
+        f"JOIN {User._meta.db_table} u ON u.id = m.user_id WHERE m.status = 'approved'"
+    )
+
+
+def drop_mentor_search(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS mentor_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_fooditem'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_mentor_search, drop_mentor_search),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+PREVIEW_LENGTH = 140
+
+
+def backfill_chat_states(apps, schema_editor):
+    # There is no record of what was read before this, so existing history
+    # starts out read; only the last-message columns are filled in.
+    Booking = apps.get_model('app', 'Booking')
+    Message = apps.get_model('app', 'Message')
+    ChatReadState = apps.get_model('app', 'ChatReadState')
+    latest = Message.objects.filter(booking=OuterRef('pk')).order_by('-timestamp', '-id')
+    bookings = Booking.objects.annotate(
+        last_id=Subquery(latest.values('id')[:1]),
+    ).values_list('pk', 'learner_id', 'mentor_id', 'last_id')
+    batch = []
+    for booking_id, learner_id, mentor_id, last_id in bookings.iterator(chunk_size=2000):
+        batch.append((booking_id, (learner_id, mentor_id), last_id))
+        if len(batch) >= 2000:
+            _create_states(Message, ChatReadState, batch)
+            batch = []
+    _create_states(Message, ChatReadState, batch)
+
+
+def _create_states(Message, ChatReadState, batch):
+    last = Message.objects.in_bulk([last_id for _, _, last_id in batch if last_id])
+    states = []
+    for booking_id, users, last_id in batch:
+        message = last.get(last_id)
+        for user_id in users:
+            states.append(ChatReadState(
+                user_id=user_id,
+                booking_id=booking_id,
+                last_message_at=message.timestamp if message else None,
+                last_message_preview=message.content[:PREVIEW_LENGTH] if message else '',
+                last_sender_id=message.sender_id if message else None,
+            ))
+    ChatReadState.objects.bulk_create(states, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_mentor_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_read_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_preview', models.CharField(blank=True, max_length=140)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_states', to='app.booking')),
+                ('last_sender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-last_message_at'], name='chat_state_inbox_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'booking'), name='unique_chat_read_state')],
+            },
+        ),
+        migrations.RunPython(backfill_chat_states, migrations.RunPython.noop),
+    ]
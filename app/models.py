@@ -41,9 +41,38 @@ class Booking(models.Model):
     duration = models.PositiveIntegerField(default=30) # Duration in minutes
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='confirmed')
     points_awarded = models.IntegerField(default=0)
+    end_time = models.DateTimeField(editable=False) # session_date + duration, kept in sync on save
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['mentor', 'end_time'], name='booking_mentor_end_idx'),
+            models.Index(fields=['learner', 'end_time'], name='booking_learner_end_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.end_time = self.session_date + timedelta(minutes=self.duration)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'session_date', 'duration'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'end_time'}
+        super().save(*args, **kwargs)
 
     def __str__(self): return f"Session with {self.mentor.user.full_name} for {self.learner.user.full_name}"
 
+class MentorRecommendation(models.Model):
+    # Precomputed by `manage.py precompute_recommendations`
+    learner = models.ForeignKey(Learner, on_delete=models.CASCADE, related_name='mentor_recommendations')
+    mentor = models.ForeignKey(Mentor, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['rank']
+        constraints = [
+            models.UniqueConstraint(fields=['learner', 'rank'], name='unique_learner_recommendation_rank'),
+        ]
+
+    def __str__(self): return f"#{self.rank} {self.mentor_id} for {self.learner_id}"
+
 class DietPlan(models.Model):
     GOAL_CHOICES = Learner.GOAL_CHOICES
     goal = models.CharField(max_length=20, choices=GOAL_CHOICES)
@@ -52,16 +81,70 @@ class DietPlan(models.Model):
     content = models.TextField()
     def __str__(self): return self.title
 
+# --- FOOD CATALOG (per serving, used by the smart diet generator) ---
+class FoodItem(models.Model):
+    CATEGORY_CHOICES = (
+        ('protein', 'Protein'), ('carb', 'Carb'), ('fat', 'Fat'),
+        ('fruit', 'Fruit'), ('veggie', 'Vegetable'),
+    )
+    name = models.CharField(max_length=100, unique=True)
+    category = models.CharField(max_length=10, choices=CATEGORY_CHOICES)
+    vegetarian = models.BooleanField(default=True)
+    serving = models.CharField(max_length=30)
+    calories = models.FloatField()
+    protein = models.FloatField(help_text="grams")
+    carbs = models.FloatField(help_text="grams")
+    fat = models.FloatField(help_text="grams")
+    def __str__(self): return f"{self.name} ({self.serving})"
+
 # --- NEW MESSAGE MODEL ---
 class Message(models.Model):
     booking = models.ForeignKey(Booking, on_delete=models.CASCADE)
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages')
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now) # set when sent, messages may be saved later in batches
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['booking', 'timestamp', 'id'], name='message_booking_ts_idx'),
+        ]
 
     def __str__(self):
-        return f"Message from {self.sender.full_name} to {self.receiver.full_name}"
\ No newline at end of file
+        return f"Message from {self.sender.full_name} to {self.receiver.full_name}"
+
+class ChatReadState(models.Model):
+    # One row per chat participant, kept current by chat_utils.record_messages
+    # and mark_read so the inbox never has to count messages.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_states')
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='chat_states')
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=140, blank=True)
+    last_sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'booking'], name='unique_chat_read_state'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-last_message_at'], name='chat_state_inbox_idx'),
+        ]
+
+    def __str__(self): return f"{self.user_id} in booking {self.booking_id}: {self.unread_count} unread"
+
+
+class MessageArchive(models.Model):
+    # Messages of a long-finished booking, moved out of the Message table by
+    # `manage.py archive_chats`. `data` is zlib-compressed JSON, oldest first:
+    # [[id, sender_id, receiver_id, iso timestamp, content], ...]
+    booking = models.OneToOneField(Booking, on_delete=models.CASCADE, primary_key=True, related_name='message_archive')
+    message_count = models.PositiveIntegerField()
+    first_message_at = models.DateTimeField()
+    last_message_at = models.DateTimeField()
+    data = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self): return f"{self.message_count} archived messages of booking {self.booking_id}"
@@ -0,0 +1,292 @@
+import importlib.util
+import os
+import threading
+import time
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Learner, Mentor, MentorRecommendation
+from .search_utils import search_mentors
+
+# scikit-learn and numpy are imported on first use, so workers that never
+# render a learner dashboard don't pay for them at boot.
+ML_AVAILABLE = importlib.util.find_spec('sklearn') is not None
+
+GOAL_QUERIES = {
+    'weight_loss': "Help me lose weight and burn fat cardio high intensity workout diet",
+    'muscle_gain': "Build muscle mass hypertrophy strength lifting bodybuilding",
+    'stamina': "Increase endurance stamina running cardio conditioning aerobic",
+    'flexibility': "Improve flexibility yoga stretching mobility balance",
+    'sports': "Sports performance agility speed athletic training competition",
+    'rehabilitation': "Injury recovery rehabilitation physiotherapy safe low impact",
+}
+GOALS = [goal for goal, _ in Learner.GOAL_CHOICES]
+
+TOP_K = 3
+# Incremental updates reuse the fitted vocabulary, so words that only appear in
+# new bios are ignored until the next full fit. Rebuild after this many updates,
+# or after REFRESH_SECONDS to pick up changes saved by other worker processes.
+REFIT_AFTER_UPDATES = 50
+REFRESH_SECONDS = 300
+# Written by `manage.py build_recommender`; loaded memory-mapped when present.
+ARTIFACT_PATH = getattr(settings, 'RECOMMENDER_ARTIFACT', settings.BASE_DIR / 'recommender.joblib')
+
+
+def mentor_document(mentor):
+    return f"{mentor.specialization} {mentor.bio}"
+
+
+def learner_document(learner):
+    # Only the goal for now; richer learner features get appended here.
+    return GOAL_QUERIES.get(learner.goal, learner.goal)
+
+
+def document_hash(document):
+    return zlib.crc32(document.encode())
+
+
+def approved_mentors():
+    return list(Mentor.objects.filter(status='approved').only('pk', 'specialization', 'bio'))
+
+
+def fit_index(mentors):
+    """
+    Fits the TF-IDF model over the given mentors plus the goal queries and
+    returns the index state: the vectorizer, goal vectors, mentor ids, a
+    (goals x mentors) score matrix and a hash of each mentor's document.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import linear_kernel
+
+    documents = [mentor_document(m) for m in mentors]
+    vectorizer = TfidfVectorizer(stop_words='english')
+    matrix = vectorizer.fit_transform(documents + [GOAL_QUERIES.get(goal, goal) for goal in GOALS])
+    goal_matrix = matrix[len(mentors):]
+    return {
+        'vectorizer': vectorizer,
+        'goal_matrix': goal_matrix,
+        'mentor_ids': [m.pk for m in mentors],
+        'scores': linear_kernel(goal_matrix, matrix[:len(mentors)]),
+        'doc_hashes': {m.pk: document_hash(doc) for m, doc in zip(mentors, documents)},
+    }
+
+
+def save_artifact(state, path=None):
+    import joblib
+
+    path = path or ARTIFACT_PATH
+    # Uncompressed so the arrays can be memory-mapped; replaced atomically so
+    # running workers never load a half-written file.
+    tmp_path = f'{path}.tmp'
+    joblib.dump(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path=None):
+    import joblib
+
+    # Copy-on-write mapping: workers share the pages until one updates a score.
+    return joblib.load(path or ARTIFACT_PATH, mmap_mode='c')
+
+
+class MentorRecommendationIndex:
+    """
+    In-memory TF-IDF index of approved mentors.
+
+    The similarity of each mentor to each of the six goals is kept in a
+    (goals x mentors) score matrix, loaded from the prebuilt artifact when
+    there is one and fitted in-process otherwise. Serving a dashboard is a
+    dict lookup of the precomputed top-k mentor ids for the learner's goal.
+    """
+
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.vectorizer = None
+        self.goal_matrix = None
+        self.mentor_ids = []
+        self.scores = None
+        self.doc_hashes = {}
+        self.top_ids = {}
+        self.built_at = 0.0
+        self.pending_updates = 0
+
+    @property
+    def is_built(self):
+        return self.vectorizer is not None
+
+    def _is_stale(self):
+        return (
+            self.pending_updates >= REFIT_AFTER_UPDATES
+            or time.monotonic() - self.built_at > REFRESH_SECONDS
+        )
+
+    def build(self, mentors=None):
+        mentors = approved_mentors() if mentors is None else list(mentors)
+        state = load_artifact() if os.path.exists(ARTIFACT_PATH) else None
+        with self._lock:
+            self._reset()
+            if state is None:
+                if not mentors:
+                    return
+                state = fit_index(mentors)
+            for key, value in state.items():
+                setattr(self, key, value)
+            self.doc_hashes = dict(self.doc_hashes)
+            self.built_at = time.monotonic()
+            self._rank()
+        self._reconcile(mentors)
+
+    def _reconcile(self, mentors):
+        # Bring an artifact built earlier up to date with the current mentors.
+        current = {m.pk for m in mentors}
+        for mentor_id in [pk for pk in self.mentor_ids if pk not in current]:
+            self.remove_mentor(mentor_id)
+        for mentor in mentors:
+            if self.doc_hashes.get(mentor.pk) != document_hash(mentor_document(mentor)):
+                self.update_mentor(mentor)
+        self.pending_updates = 0
+
+    def _rank(self):
+        import numpy as np
+
+        # Stable sort keeps the queryset order for ties, like the old per-request ranking.
+        order = np.argsort(-self.scores, axis=1, kind='stable')[:, :self.top_k]
+        self.top_ids = {
+            goal: [self.mentor_ids[i] for i in order[row]]
+            for row, goal in enumerate(GOALS)
+        }
+
+    def update_mentor(self, mentor):
+        """Insert or refresh one approved mentor's column without refitting."""
+        if not self.is_built:
+            return
+        import numpy as np
+        from sklearn.metrics.pairwise import linear_kernel
+
+        with self._lock:
+            document = mentor_document(mentor)
+            column = linear_kernel(self.goal_matrix, self.vectorizer.transform([document]))
+            if mentor.pk in self.doc_hashes:
+                self.scores[:, self.mentor_ids.index(mentor.pk)] = column[:, 0]
+            else:
+                self.mentor_ids.append(mentor.pk)
+                self.scores = np.hstack([self.scores, column])
+            self.doc_hashes[mentor.pk] = document_hash(document)
+            self.pending_updates += 1
+            self._rank()
+
+    def remove_mentor(self, mentor_id):
+        if mentor_id not in self.doc_hashes:
+            return
+        import numpy as np
+
+        with self._lock:
+            if mentor_id not in self.doc_hashes:
+                return
+            position = self.mentor_ids.index(mentor_id)
+            del self.mentor_ids[position]
+            del self.doc_hashes[mentor_id]
+            self.scores = np.delete(self.scores, position, axis=1)
+            self._rank()
+
+    def recommended_ids(self, goal):
+        if not self.is_built or self._is_stale():
+            self.build()
+        return self.top_ids.get(goal, [])
+
+
+mentor_index = MentorRecommendationIndex()
+
+
+def precompute_learner_recommendations(chunk_size=1000, top_k=TOP_K, progress=None):
+    """
+    Recomputes the MentorRecommendation table for every learner.
+
+    Learners are read in primary-key chunks; each chunk's distinct learner
+    documents are vectorized and scored against all mentors in one sparse
+    matrix product, so memory stays bounded by chunk_size x mentors.
+    Returns the number of learners processed.
+    """
+    import numpy as np
+
+    mentors = approved_mentors()
+    if not mentors:
+        return 0
+    vectorizer = fit_index(mentors)['vectorizer']
+    mentor_matrix = vectorizer.transform([mentor_document(m) for m in mentors])
+    mentor_ids = np.array([m.pk for m in mentors])
+    top_k = min(top_k, len(mentors))
+
+    processed, last_pk = 0, None
+    while True:
+        learners = Learner.objects.order_by('pk').only('pk', 'goal')
+        if last_pk is not None:
+            learners = learners.filter(pk__gt=last_pk)
+        learners = list(learners[:chunk_size])
+        if not learners:
+            return processed
+
+        documents, inverse = np.unique([learner_document(l) for l in learners], return_inverse=True)
+        scores = (vectorizer.transform(documents) @ mentor_matrix.T).toarray()
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+
+        rows = []
+        for learner, doc in zip(learners, inverse):
+            for rank, column in enumerate(order[doc], start=1):
+                rows.append(MentorRecommendation(
+                    learner_id=learner.pk, mentor_id=int(mentor_ids[column]),
+                    rank=rank, score=float(scores[doc, column]),
+                ))
+        with transaction.atomic():
+            MentorRecommendation.objects.filter(
+                learner_id__gte=learners[0].pk, learner_id__lte=learners[-1].pk
+            ).delete()
+            MentorRecommendation.objects.bulk_create(rows)
+
+        processed += len(learners)
+        last_pk = learners[-1].pk
+        if progress:
+            progress(processed)
+
+
+def invalidate_learner_recommendations():
+    """
+    Drops every precomputed MentorRecommendation row. Each row ranks a mentor
+    against all approved mentors, so approving, editing or removing any of
+    them makes them all stale; dashboards read the live index, which is
+    updated incrementally, until `precompute_recommendations` runs again.
+    """
+    MentorRecommendation.objects.all().delete()
+
+
+def get_recommended_mentors(learner):
+    """
+    Returns up to TOP_K approved mentors for a learner, best match first.
+
+    Reads the precomputed MentorRecommendation rows when the batch job has
+    covered this learner since the last mentor change, otherwise the
+    in-memory per-goal index. Falls back
+    to a full-text search for the goal when scikit-learn is not installed.
+    """
+    precomputed = [
+        r.mentor for r in MentorRecommendation.objects.filter(
+            learner=learner, mentor__status='approved'
+        ).select_related('mentor__user')
+    ]
+    if precomputed:
+        return precomputed
+    goal = learner.goal
+    if ML_AVAILABLE:
+        try:
+            ids = mentor_index.recommended_ids(goal)
+            mentors = Mentor.objects.select_related('user').in_bulk(ids)
+            return [mentors[pk] for pk in ids if pk in mentors]
+        except Exception as e:
+            print(f"ML Recommendation Error: {e}")
+    return search_mentors(goal.replace('_', ' '), limit=TOP_K)
@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.exceptions import ChannelFull
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Booking
+
+REMINDER_LEAD = timedelta(minutes=getattr(settings, 'SESSION_REMINDER_MINUTES', 15))
+# Bookings are loaded from the database this far ahead; later ones arrive as
+# the window slides, or straight from the booking signals.
+REMINDER_WINDOW = timedelta(hours=6)
+# Shared channel the `run_reminders` worker listens on for booking changes.
+SCHEDULER_CHANNEL = 'session-reminders'
+
+
+def notify_group(user_id):
+    return f'notify_{user_id}'
+
+
+def booking_changed(booking, deleted=False):
+    """Tells the reminder worker about a created, moved or cancelled booking once it is committed."""
+    message = {'type': 'booking.cancel', 'booking': booking.pk}
+    if not deleted and booking.status == 'confirmed':
+        message = {'type': 'booking.schedule', 'booking': booking.pk, 'session_date': booking.session_date.isoformat()}
+    transaction.on_commit(lambda: _send_change(message))
+
+
+def _send_change(message):
+    try:
+        async_to_sync(get_channel_layer().send)(SCHEDULER_CHANNEL, message)
+    except ChannelFull:
+        # No worker is draining the channel; it loads bookings from the database when it starts.
+        pass
+
+
+class ReminderScheduler:
+    """
+    Min-heap of (fire_at, booking_id, session_date) for the reminders due in
+    the loaded window. Cancelling or moving a booking doesn't touch the heap:
+    `sessions` holds each booking's current start, and stale entries are
+    dropped when they reach the top. `sent` remembers fired reminders so a
+    later save of the same booking doesn't send another one.
+    """
+
+    def __init__(self, lead=REMINDER_LEAD, window=REMINDER_WINDOW):
+        self.lead = lead
+        self.window = window
+        self.heap = []
+        self.sessions = {}
+        self.sent = {}
+        self.loaded_until = None
+
+    def schedule(self, booking_id, session_date, now):
+        self.sessions.pop(booking_id, None)
+        # Past sessions are dropped, and ones beyond the window are picked up by a later load.
+        if now < session_date and (self.loaded_until is None or session_date < self.loaded_until):
+            self._push(booking_id, session_date)
+
+    def _push(self, booking_id, session_date):
+        if self.sent.get(booking_id) == session_date:
+            return
+        self.sessions[booking_id] = session_date
+        heapq.heappush(self.heap, (session_date - self.lead, booking_id, session_date))
+
+    def cancel(self, booking_id):
+        self.sessions.pop(booking_id, None)
+
+    def needs_load(self, now):
+        return self.loaded_until is None or self.loaded_until - now < self.window / 2
+
+    def load(self, now):
+        """Adds the confirmed bookings starting between the loaded window's end and now + window."""
+        start, until = max(self.loaded_until or now, now), now + self.window
+        bookings = Booking.objects.filter(
+            status='confirmed', session_date__gte=start, session_date__lt=until,
+        ).values_list('pk', 'session_date')
+        for booking_id, session_date in bookings:
+            self._push(booking_id, session_date)
+        self.loaded_until = until
+        self.sent = {pk: session_date for pk, session_date in self.sent.items() if session_date > now}
+
+    def pop_due(self, now):
+        """Returns {booking_id: session_date} for reminders due at `now`."""
+        due = {}
+        while self.heap and self.heap[0][0] <= now:
+            _, booking_id, session_date = heapq.heappop(self.heap)
+            if self.sessions.get(booking_id) == session_date:
+                due[booking_id] = self.sent[booking_id] = self.sessions.pop(booking_id)
+        return due
+
+    def seconds_until_next(self, now, maximum):
+        while self.heap and self.sessions.get(self.heap[0][1]) != self.heap[0][2]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return maximum
+        return min(maximum, max(0.0, (self.heap[0][0] - now).total_seconds()))
+
+
+def reminder_events(due):
+    """Builds one notification per participant of the due bookings that are still on."""
+    bookings = Booking.objects.filter(pk__in=list(due), status='confirmed').select_related('learner__user', 'mentor__user')
+    events = []
+    for booking in bookings:
+        if booking.session_date != due[booking.pk]:
+            continue
+        for user, other in ((booking.learner.user, booking.mentor.user), (booking.mentor.user, booking.learner.user)):
+            events.append((user.id, {
+                'type': 'session.reminder',
+                'booking': booking.pk,
+                'with': other.full_name,
+                'session_date': booking.session_date.isoformat(),
+                'minutes': round((booking.session_date - timezone.now()).total_seconds() / 60),
+            }))
+    return events
+
+
+async def run_reminders(scheduler=None, max_sleep=60.0, log=None):
+    """
+    Sends each confirmed booking's participants a `session.reminder` over
+    their notify group REMINDER_LEAD before it starts. Sleeps until the next
+    reminder is due or a booking change arrives on SCHEDULER_CHANNEL, and
+    reloads from the database only as the window slides.
+    """
+    layer = get_channel_layer()
+    scheduler = scheduler or ReminderScheduler()
+    changes = asyncio.Queue()
+
+    async def listen():
+        # receive() isn't safe to cancel mid-read, so it runs in its own task.
+        while True:
+            await changes.put(await layer.receive(SCHEDULER_CHANNEL))
+
+    listener = asyncio.ensure_future(listen())
+    try:
+        while True:
+            if listener.done():
+                listener.result()  # re-raises what stopped the listener
+            now = timezone.now()
+            if scheduler.needs_load(now):
+                await sync_to_async(close_old_connections)()
+                await sync_to_async(scheduler.load)(now)
+            due = scheduler.pop_due(now)
+            if due:
+                events = await sync_to_async(reminder_events)(due)
+                for user_id, event in events:
+                    await layer.group_send(notify_group(user_id), event)
+                if log:
+                    log(f"Sent {len(events)} reminders for {len(due)} sessions")
+            try:
+                change = await asyncio.wait_for(changes.get(), scheduler.seconds_until_next(timezone.now(), max_sleep))
+            except asyncio.TimeoutError:
+                continue
+            if change['type'] == 'booking.schedule':
+                scheduler.schedule(change['booking'], datetime.fromisoformat(change['session_date']), timezone.now())
+            else:
+                scheduler.cancel(change['booking'])
+    finally:
+        listener.cancel()
@@ -0,0 +1,63 @@
+import contextvars
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+READ_ALIAS = 'read'
+
+_read_only_request = contextvars.ContextVar('read_only_request', default=False)
+
+
+class ReadOnlyRequestMiddleware:
+    """Marks GET/HEAD/OPTIONS requests so ReadReplicaRouter can route their reads."""
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _read_only_request.set(request.method in self.SAFE_METHODS)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_only_request.reset(token)
+
+    async def __acall__(self, request):
+        # Set in the request's context, so the ORM's worker threads see it too.
+        token = _read_only_request.set(request.method in self.SAFE_METHODS)
+        try:
+            return await self.get_response(request)
+        finally:
+            _read_only_request.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads made while serving a safe-method request to the 'read'
+    connection. Both aliases point at the same SQLite file, so every
+    committed write is visible to it immediately. Writes, reads inside an
+    atomic block (e.g. select_for_update) and reads outside a request
+    (consumers, commands) stay on 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_only_request.get() and not connections['default'].in_atomic_block:
+            return READ_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_ALIAS
@@ -3,4 +3,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/chat/(?P<booking_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/notify/$', consumers.NotificationConsumer.as_asgi()),
 ]
\ No newline at end of file
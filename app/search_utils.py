@@ -0,0 +1,83 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Mentor, User
+
+# FTS5 table over approved mentors; rowid is the mentor's primary key (its user id).
+SEARCH_TABLE = 'mentor_search'
+MAX_TERMS = 8
+
+
+def fts_enabled():
+    # The index is created by migration 0011 on SQLite only; other backends fall back to LIKE.
+    return connection.vendor == 'sqlite'
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def index_mentor(mentor):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [mentor.pk])
+        if mentor.status == 'approved':
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, name, specialization, bio) VALUES (%s, %s, %s, %s)",
+                [mentor.pk, mentor.user.full_name, mentor.specialization, mentor.bio],
+            )
+
+
+def unindex_mentor(mentor_id):
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [mentor_id])
+
+
+def rename_mentor(user):
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {SEARCH_TABLE} SET name = %s WHERE rowid = %s", [user.full_name, user.pk])
+
+
+def rebuild_mentor_search():
+    """Re-indexes every approved mentor, e.g. after rows were bulk-created without signals."""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, specialization, bio) "
+            f"SELECT m.user_id, u.full_name, m.specialization, m.bio FROM {Mentor._meta.db_table} m "
+            f"JOIN {User._meta.db_table} u ON u.id = m.user_id "
+            f"WHERE m.status = 'approved'"
+        )
+
+
+def search_mentors(query, limit=20):
+    """
+    Approved mentors whose name, specialization or bio match every word of
+    the query (as a prefix), best match first. Uses the FTS5 index with bm25
+    ranking on SQLite and a LIKE scan elsewhere.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    mentors = Mentor.objects.filter(status='approved').select_related('user')
+    if not fts_enabled():
+        match = Q()
+        for term in terms:
+            match &= Q(user__full_name__icontains=term) | Q(specialization__icontains=term) | Q(bio__icontains=term)
+        return list(mentors.filter(match).order_by('-points', 'pk')[:limit])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s",
+            [' '.join(f'"{term}"*' for term in terms), limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    found = mentors.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
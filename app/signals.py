@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .ai_diet_utils import bump_catalog_version, invalidate_diet_plans_pages
+from .booking_utils import invalidate_booking_summaries
+from .chat_utils import create_read_states
+from .leaderboard_utils import leaderboard
+from .models import Booking, DietPlan, FoodItem, Mentor, MentorRecommendation, User
+from .recommendation_utils import invalidate_learner_recommendations, mentor_index
+from .reminder_utils import booking_changed
+from .search_utils import index_mentor, rename_mentor, unindex_mentor
+
+
+@receiver(post_save, sender=Mentor)
+def sync_mentor_recommendations(sender, instance, **kwargs):
+    if instance.status == 'approved':
+        mentor_index.update_mentor(instance)
+    else:
+        mentor_index.remove_mentor(instance.pk)
+
+
+@receiver(post_delete, sender=Mentor)
+def drop_mentor_recommendations(sender, instance, **kwargs):
+    mentor_index.remove_mentor(instance.pk)
+
+
+@receiver(post_save, sender=Mentor)
+@receiver(post_delete, sender=Mentor)
+def reset_learner_recommendations(sender, instance, **kwargs):
+    # Saves of mentors that are neither approved nor recommended can't change any ranking.
+    if instance.status == 'approved' or MentorRecommendation.objects.filter(mentor_id=instance.pk).exists():
+        transaction.on_commit(invalidate_learner_recommendations)
+
+
+@receiver(post_save, sender=Mentor)
+def sync_mentor_leaderboard(sender, instance, **kwargs):
+    if instance.status == 'approved':
+        leaderboard.upsert(instance)
+    else:
+        leaderboard.remove(instance.pk)
+
+
+@receiver(post_delete, sender=Mentor)
+def drop_mentor_leaderboard(sender, instance, **kwargs):
+    leaderboard.remove(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def sync_leaderboard_name(sender, instance, **kwargs):
+    if instance.role == 'mentor':
+        leaderboard.rename(instance)
+
+
+@receiver(post_save, sender=Mentor)
+def sync_mentor_search(sender, instance, **kwargs):
+    index_mentor(instance)
+
+
+@receiver(post_delete, sender=Mentor)
+def drop_mentor_search(sender, instance, **kwargs):
+    unindex_mentor(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def sync_mentor_search_name(sender, instance, **kwargs):
+    if instance.role == 'mentor':
+        rename_mentor(instance)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def reset_booking_summaries(sender, instance, **kwargs):
+    # After commit, so a concurrent read can't re-cache the old rows in between.
+    transaction.on_commit(lambda: invalidate_booking_summaries(instance))
+
+
+@receiver(post_save, sender=Booking)
+def add_chat_read_states(sender, instance, created, **kwargs):
+    if created:
+        create_read_states(instance)
+
+
+@receiver(post_save, sender=Booking)
+def schedule_session_reminder(sender, instance, **kwargs):
+    booking_changed(instance)
+
+
+@receiver(post_delete, sender=Booking)
+def cancel_session_reminder(sender, instance, **kwargs):
+    booking_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=FoodItem)
+@receiver(post_delete, sender=FoodItem)
+def reset_diet_plans(sender, **kwargs):
+    # Other processes see the new version in the shared cache and rebuild.
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=DietPlan)
+@receiver(post_delete, sender=DietPlan)
+def reset_diet_plans_pages(sender, **kwargs):
+    transaction.on_commit(invalidate_diet_plans_pages)
@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import os
+import threading
+from functools import wraps
+
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it only gzip is served
+    brotli = None
+
+STATIC_PAGE_MAX_AGE = 600
+
+
+class CachedPage:
+    """One rendered page: its body, validators and precompressed variants."""
+
+    def __init__(self, response, template_path):
+        self.template_path = template_path
+        self.content = response.content
+        self.content_type = response['Content-Type']
+        self.etag = f'W/"{hashlib.sha256(self.content).hexdigest()[:32]}"'
+        self.last_modified = int(os.path.getmtime(template_path))
+        self.bodies = {'gzip': gzip.compress(self.content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(self.content)
+
+    def is_stale(self):
+        return int(os.path.getmtime(self.template_path)) != self.last_modified
+
+    def encoding_for(self, request):
+        accepted = {
+            token.split(';')[0].strip().lower()
+            for token in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.bodies:
+                return encoding
+        return None
+
+    def respond(self, request):
+        encoding = self.encoding_for(request)
+        response = HttpResponse(self.bodies[encoding] if encoding else self.content, content_type=self.content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = str(len(response.content))
+        return response
+
+
+def static_page(template_name):
+    """
+    Serves a view whose output never depends on the request from memory.
+
+    The view runs once per process; later GET/HEAD requests get the stored
+    body (gzip or brotli when accepted) with a weak ETag and the template's
+    Last-Modified, and matching conditional requests get a 304 without the
+    view running at all. Only use it for templates that don't read the
+    user, session or CSRF token. Editing the template re-renders the page.
+    """
+    def decorator(view):
+        lock = threading.Lock()
+        cached = {}
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            page = cached.get('page')
+            if page is None or page.is_stale():
+                with lock:
+                    page = cached.get('page')
+                    if page is None or page.is_stale():
+                        response = view(request, *args, **kwargs)
+                        if response.status_code != 200:
+                            return response
+                        page = cached['page'] = CachedPage(response, get_template(template_name).origin.name)
+            response = get_conditional_response(request, etag=page.etag, last_modified=page.last_modified)
+            if response is None:
+                response = page.respond(request)
+            response['ETag'] = page.etag
+            response['Last-Modified'] = http_date(page.last_modified)
+            response['Cache-Control'] = f'public, max-age={STATIC_PAGE_MAX_AGE}'
+            patch_vary_headers(response, ['Accept-Encoding'])
+            return response
+
+        return wrapper
+
+    return decorator
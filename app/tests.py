@@ -1,3 +1,611 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import multiprocessing
+import tempfile
+from datetime import datetime, time, timedelta
+from functools import partial
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import brotli
+from asgiref.sync import async_to_sync
+from django.contrib.auth import aget_user, get_user
+from django.core.cache import cache
+from django.http import HttpRequest
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.db import OperationalError
+from django.db.models import Value
+from django.db.models.functions import Concat
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .archive_utils import archive_messages, restore_messages
+from .booking_utils import (
+    SlotUnavailable, create_booking, get_free_slots, get_learner_summary, get_mentor_summary, group_slots_by_day,
+)
+from . import async_views, consumers
+from .ai_diet_utils import (
+    GOAL_TARGETS, PLAN_VARIANTS, _diet_page_key, generate_smart_diet_plan, render_diet_plans_page,
+)
+from .chat_utils import get_message_page, record_messages
+from .layers import SQLiteChannelLayer
+from .leaderboard_utils import leaderboard
+from .middleware import QueryBudgetExceeded
+from .models import (
+    Booking, ChatReadState, DietPlan, FoodItem, Learner, Mentor, MentorRecommendation, Message, MessageArchive, User,
+)
+from .recommendation_utils import get_recommended_mentors, mentor_index, precompute_learner_recommendations
+from .reminder_utils import SCHEDULER_CHANNEL, ReminderScheduler
+from .search_utils import search_mentors
+
+
+def make_learner(name='Test Learner', goal='stamina'):
+    user = User.objects.create(username=f'{name.lower().replace(" ", ".")}@college.edu', full_name=name, role='learner')
+    return Learner.objects.create(user=user, goal=goal)
+
+
+def make_mentor(name='Test Mentor', points=0):
+    user = User.objects.create(username=f'{name.lower().replace(" ", ".")}@college.edu', full_name=name, role='mentor')
+    return Mentor.objects.create(
+        user=user, specialization='Endurance running', experience=3, bio='Cardio and stamina coach',
+        application_text='-', form_check_video_url='https://example.com/video', status='approved', points=points,
+    )
+
+
+def _layer_worker(path, ready, results):
+    async def run():
+        layer = SQLiteChannelLayer(path)
+        channel = await layer.new_channel()
+        await layer.group_add('room', channel)
+        ready.put(channel)
+        for _ in range(2):
+            message = await asyncio.wait_for(layer.receive(channel), 10)
+            results.put((channel, message['text']))
+    asyncio.run(run())
+
+
+class SQLiteChannelLayerTests(SimpleTestCase):
+    def test_group_send_reaches_other_processes(self):
+        ctx = multiprocessing.get_context('fork')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / 'channels.sqlite3')
+            ready, results = ctx.Queue(), ctx.Queue()
+            workers = [ctx.Process(target=_layer_worker, args=(path, ready, results)) for _ in range(2)]
+            for worker in workers:
+                worker.start()
+            channels = {ready.get(timeout=10) for _ in workers}
+
+            layer = SQLiteChannelLayer(path)
+            first, second = sorted(channels)
+            asyncio.run(layer.group_send('room', {'type': 'chat.message', 'text': 'to everyone'}))
+            asyncio.run(layer.send(first, {'type': 'chat.message', 'text': 'direct'}))
+            asyncio.run(layer.send(second, {'type': 'chat.message', 'text': 'direct'}))
+
+            received = sorted(results.get(timeout=10) for _ in range(4))
+            for worker in workers:
+                worker.join(10)
+
+        self.assertEqual(received, sorted([
+            (first, 'to everyone'), (second, 'to everyone'),
+            (first, 'direct'), (second, 'direct'),
+        ]))
+
+
+class ViewQueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.learner = make_learner()
+        self.client.force_login(self.learner.user)
+
+    @override_settings(VIEW_QUERY_BUDGETS={'progress_tracker': 1})
+    def test_strict_budget_fails_over_budget_views(self):
+        # Strict mode is on for the whole test suite, not just this test.
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('progress_tracker'))
+
+    @override_settings(VIEW_QUERY_BUDGETS={'progress_tracker': 1}, VIEW_QUERY_BUDGET_STRICT=False)
+    def test_budget_only_warns_when_not_strict(self):
+        with self.assertLogs('campusfit.metrics', 'WARNING'):
+            response = self.client.get(reverse('progress_tracker'))
+        self.assertEqual(response.status_code, 200)
+
+
+class BookingListingQueryTests(TestCase):
+    """Booking listings must run a fixed number of queries however many rows they show."""
+
+    BOOKING_COUNTS = (1, 100, 1000)
+
+    def setUp(self):
+        self.learners = [make_learner(f'Learner {i}') for i in range(3)]
+        self.mentors = [make_mentor(f'Mentor {i}') for i in range(3)]
+        self.learner, self.mentor = self.learners[0], self.mentors[0]
+
+    def add_bookings(self, total):
+        # Half in the past and half upcoming, spread over other learners and mentors.
+        now = timezone.now()
+        existing = Booking.objects.count()
+        bookings = []
+        for i in range(existing, total):
+            start = now + timedelta(hours=i - total // 2)
+            bookings.append(Booking(
+                learner=self.learner if i % 2 else self.learners[i % 3],
+                mentor=self.mentor if i % 2 == 0 else self.mentors[i % 3],
+                session_date=start, end_time=start + timedelta(minutes=30),
+            ))
+        Booking.objects.bulk_create(bookings)
+
+    def assert_constant_queries(self, url, user, queries):
+        for total in self.BOOKING_COUNTS:
+            self.add_bookings(total)
+            # Start each request from a cold cache so cached summaries don't change the count.
+            cache.clear()
+            self.client.force_login(user)
+            with self.subTest(bookings=total), self.assertNumQueries(queries):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_learner_booking_list(self):
+        self.assert_constant_queries(reverse('booking'), self.learner.user, 3)
+
+    def test_mentor_booking_list(self):
+        self.assert_constant_queries(reverse('booking'), self.mentor.user, 3)
+
+    def test_mentor_dashboard(self):
+        self.assert_constant_queries(reverse('mentor_dash'), self.mentor.user, 3)
+
+    def test_progress_tracker(self):
+        self.assert_constant_queries(reverse('progress_tracker'), self.learner.user, 3)
+
+    def test_admin_booking_changelist(self):
+        admin = User.objects.create_superuser('admin@college.edu', 'admin@college.edu', 'password', full_name='Admin')
+        self.assert_constant_queries(reverse('admin:app_booking_changelist'), admin, 4)
+
+
+class MentorSearchTests(TestCase):
+    def test_index_follows_mentor_and_user_changes(self):
+        mentor = make_mentor('Asha Rao')
+        self.assertEqual(search_mentors('stamina coach'), [mentor])
+        self.assertEqual(search_mentors('endur'), [mentor])
+
+        mentor.user.full_name = 'Asha Menon'
+        mentor.user.save()
+        self.assertEqual(search_mentors('menon'), [mentor])
+        self.assertEqual(search_mentors('rao'), [])
+
+        mentor.status = 'rejected'
+        mentor.save()
+        self.assertEqual(search_mentors('asha'), [])
+
+
+class ChatInboxTests(TestCase):
+    def test_unread_counts_follow_messages_and_reads(self):
+        learner, mentor = make_learner(), make_mentor()
+        booking = Booking.objects.create(learner=learner, mentor=mentor, session_date=timezone.now())
+        batch = Message.objects.bulk_create([
+            Message(booking=booking, sender=learner.user, receiver=mentor.user, content=f'Hi {i}')
+            for i in range(3)
+        ])
+        record_messages(batch)
+        state = ChatReadState.objects.get(user=mentor.user, booking=booking)
+        self.assertEqual((state.unread_count, state.last_message_preview), (3, 'Hi 2'))
+        self.assertEqual(ChatReadState.objects.get(user=learner.user, booking=booking).unread_count, 0)
+
+        self.client.force_login(mentor.user)
+        with self.assertNumQueries(2):
+            self.assertContains(self.client.get(reverse('inbox')), '<span class="unread-badge">')
+        self.client.get(reverse('chat', args=[booking.id]))
+        self.assertNotContains(self.client.get(reverse('inbox')), '<span class="unread-badge">')
+
+
+class MessageArchiveTests(TestCase):
+    def test_archived_history_pages_like_live_history(self):
+        learner, mentor = make_learner(), make_mentor()
+        ended = Booking.objects.create(learner=learner, mentor=mentor, session_date=timezone.now() - timedelta(days=200))
+        recent = Booking.objects.create(learner=learner, mentor=mentor, session_date=timezone.now())
+        for booking in (ended, recent):
+            Message.objects.bulk_create([
+                Message(booking=booking, sender=learner.user, receiver=mentor.user, content=f'Message {i}',
+                        timestamp=booking.session_date + timedelta(minutes=i))
+                for i in range(5)
+            ])
+
+        def history(booking):
+            page, has_more = get_message_page(booking, limit=2)
+            while has_more:
+                older, has_more = get_message_page(booking, before=page[0].id, limit=2)
+                page = older + page
+            return [(m.id, m.content, m.sender.full_name) for m in page]
+
+        expected = history(ended)
+        self.assertEqual(archive_messages(days=90), (1, 5))
+        self.assertFalse(Message.objects.filter(booking=ended).exists())
+        self.assertEqual(Message.objects.filter(booking=recent).count(), 5)
+        self.assertEqual(history(ended), expected)
+
+        self.assertEqual(restore_messages(), 5)
+        self.assertFalse(MessageArchive.objects.exists())
+        self.assertEqual(history(ended), expected)
+
+    def test_recent_chats_skip_the_archive(self):
+        learner, mentor = make_learner(), make_mentor()
+        booking = Booking.objects.create(learner=learner, mentor=mentor, session_date=timezone.now())
+        Message.objects.create(booking=booking, sender=learner.user, receiver=mentor.user, content='Hi')
+        with self.assertNumQueries(1):
+            page, has_more = get_message_page(booking)
+        self.assertEqual([m.content for m in page], ['Hi'])
+        self.assertFalse(has_more)
+
+    def test_cannot_archive_before_the_cutoff(self):
+        with self.assertRaises(ValueError):
+            archive_messages(days=30)
+
+
+class ReminderSchedulerTests(SimpleTestCase):
+    def test_moves_and_cancellations_skip_stale_heap_entries(self):
+        now = timezone.now()
+        scheduler = ReminderScheduler(lead=timedelta(minutes=15), window=timedelta(hours=6))
+        scheduler.loaded_until = now + timedelta(hours=6)
+        scheduler.schedule(1, now + timedelta(minutes=20), now)
+        scheduler.schedule(2, now + timedelta(minutes=30), now)
+        scheduler.schedule(3, now + timedelta(minutes=40), now)
+        scheduler.schedule(1, now + timedelta(minutes=50), now)  # moved
+        scheduler.cancel(2)
+        scheduler.schedule(4, now + timedelta(hours=7), now)  # beyond the window
+
+        self.assertEqual(scheduler.seconds_until_next(now, 60), 60)
+        self.assertEqual(scheduler.pop_due(now + timedelta(minutes=30)), {3: now + timedelta(minutes=40)})
+        self.assertEqual(scheduler.pop_due(now + timedelta(minutes=40)), {1: now + timedelta(minutes=50)})
+        # Saving a booking again after its reminder went out doesn't repeat it.
+        scheduler.schedule(3, now + timedelta(minutes=40), now + timedelta(minutes=30))
+        self.assertEqual(scheduler.pop_due(now + timedelta(hours=6)), {})
+
+
+class BookingChangeTests(TestCase):
+    def test_changes_go_to_the_test_channel_layer(self):
+        self.assertIsInstance(get_channel_layer(), InMemoryChannelLayer)
+        # The layer is shared by the whole run; drop what earlier tests' bookings sent.
+        async_to_sync(get_channel_layer().flush)()
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = Booking.objects.create(
+                learner=make_learner(), mentor=make_mentor(), session_date=timezone.now() + timedelta(hours=1),
+            )
+        message = async_to_sync(get_channel_layer().receive)(SCHEDULER_CHANNEL)
+        self.assertEqual(message, {
+            'type': 'booking.schedule', 'booking': booking.pk, 'session_date': booking.session_date.isoformat(),
+        })
+
+
+def local(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class FreeSlotTests(TestCase):
+    def setUp(self):
+        self.learner, self.mentor = make_learner(), make_mentor()
+        self.day = timezone.localtime().date() + timedelta(days=2)
+
+    def book(self, hour, minute=0, duration=30):
+        return Booking.objects.create(
+            learner=self.learner, mentor=self.mentor, session_date=local(self.day, hour, minute), duration=duration,
+        )
+
+    def free(self, start, end):
+        return get_free_slots(self.mentor, start, end)[self.mentor.pk]
+
+    def test_busy_intervals_block_only_overlapping_slots(self):
+        self.book(8)
+        self.book(8, 30)  # back-to-back with the one before
+        self.book(10, 15)  # off the slot grid: blocks 10:00 and 10:30
+        self.assertEqual(self.free(local(self.day, 7), local(self.day, 12)), [
+            local(self.day, 7), local(self.day, 7, 30), local(self.day, 9), local(self.day, 9, 30),
+            local(self.day, 11), local(self.day, 11, 30),
+        ])
+
+    def test_slots_ending_on_a_boundary_are_offered(self):
+        self.book(9)
+        # 8:30 ends exactly when the booking starts, 9:30 starts exactly when it ends.
+        self.assertEqual(self.free(local(self.day, 8, 30), local(self.day, 10)), [
+            local(self.day, 8, 30), local(self.day, 9, 30),
+        ])
+        # The last slot of the day ends exactly at closing time.
+        self.assertEqual(self.free(local(self.day, 21), local(self.day, 23)), [
+            local(self.day, 21), local(self.day, 21, 30),
+        ])
+
+    def test_group_slots_by_day(self):
+        slots = self.free(local(self.day, 21, 30), local(self.day + timedelta(days=1), 7))
+        self.assertEqual(group_slots_by_day(slots), [
+            (self.day, [time(21, 30)]),
+            (self.day + timedelta(days=1), [time(6), time(6, 30)]),
+        ])
+
+
+class CreateBookingTests(TestCase):
+    def setUp(self):
+        self.learner, self.mentor = make_learner(), make_mentor()
+        self.day = timezone.localtime().date() + timedelta(days=2)
+
+    def test_back_to_back_bookings_are_allowed(self):
+        create_booking(self.learner, self.mentor, local(self.day, 9))
+        create_booking(self.learner, self.mentor, local(self.day, 9, 30))
+        create_booking(self.learner, self.mentor, local(self.day, 8, 30))
+        self.assertEqual(Booking.objects.filter(mentor=self.mentor).count(), 3)
+
+    def test_taken_or_overlapping_slot_raises(self):
+        create_booking(self.learner, self.mentor, local(self.day, 9))
+        other = make_learner('Other Learner')
+        for start in (local(self.day, 9), local(self.day, 9, 15), local(self.day, 8, 45)):
+            with self.subTest(start=start), self.assertRaises(SlotUnavailable):
+                create_booking(other, self.mentor, start)
+        with self.assertRaises(SlotUnavailable):
+            create_booking(other, self.mentor, local(self.day, 8), duration=120)
+        self.assertEqual(Booking.objects.filter(mentor=self.mentor).count(), 1)
+
+    def test_other_mentors_are_independent(self):
+        create_booking(self.learner, self.mentor, local(self.day, 9))
+        create_booking(self.learner, make_mentor('Other Mentor'), local(self.day, 9))
+        self.assertEqual(Booking.objects.count(), 2)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.mentors = [make_mentor(f'Mentor {i}', points=points) for i, points in enumerate([5, 9, 5, 0])]
+        leaderboard.load()
+
+    def test_ranks_by_points_then_mentor_id(self):
+        first, second, third, fourth = self.mentors
+        self.assertEqual(leaderboard.top(), [second, first, third, fourth])
+        self.assertEqual([leaderboard.rank(m.pk) for m in self.mentors], [2, 1, 3, 4])
+        page, cursor = leaderboard.page(n=2)
+        self.assertEqual((page, cursor), ([second, first], (5, first.pk)))
+        self.assertEqual(leaderboard.page(cursor, n=2), ([third, fourth], None))
+
+    def test_awarded_points_update_ranks_after_commit(self):
+        learner = make_learner()
+        mentor = self.mentors[3]
+        booking = Booking.objects.create(learner=learner, mentor=mentor, session_date=timezone.now() - timedelta(hours=2))
+        self.client.force_login(learner.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('award_points', args=[booking.id]), {'points': 10})
+        self.assertEqual(leaderboard.rank(mentor.pk), 1)
+        self.assertEqual(leaderboard.top(1)[0].points, 10)
+
+        mentor.status = 'rejected'
+        mentor.save()
+        self.assertIsNone(leaderboard.rank(mentor.pk))
+        self.assertEqual(len(leaderboard.top()), 3)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ChatWriteBehindTests(TransactionTestCase):
+    """Messages are broadcast at once and saved in batches; none may be dropped."""
+
+    def setUp(self):
+        self.learner, self.mentor = make_learner(), make_mentor()
+        self.booking = Booking.objects.create(learner=self.learner, mentor=self.mentor, session_date=timezone.now())
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(
+            consumers.ChatConsumer.as_asgi(), f'/ws/chat/{self.booking.id}/',
+        )
+        communicator.scope['url_route'] = {'kwargs': {'booking_id': self.booking.id}}
+        communicator.scope['user'] = self.learner.user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def send(self, communicator, *texts):
+        for text in texts:
+            await communicator.send_json_to({'message': text})
+            await communicator.receive_json_from()
+
+    async def saved(self):
+        return [m async for m in Message.objects.filter(booking=self.booking).values_list('content', flat=True)]
+
+    @mock.patch.object(consumers, 'FLUSH_BATCH_SIZE', 2)
+    @mock.patch.object(consumers, 'FLUSH_INTERVAL', 60)
+    async def test_full_batch_is_saved_immediately(self):
+        communicator = await self.connect()
+        await self.send(communicator, 'one', 'two', 'three')
+        self.assertEqual(await self.saved(), ['one', 'two'])
+        await communicator.disconnect()
+        self.assertEqual(await self.saved(), ['one', 'two', 'three'])
+
+    @mock.patch.object(consumers, 'FLUSH_BATCH_SIZE', 20)
+    @mock.patch.object(consumers, 'FLUSH_INTERVAL', 0.05)
+    async def test_timer_saves_partial_batch(self):
+        communicator = await self.connect()
+        await self.send(communicator, 'one')
+        await asyncio.sleep(0.3)
+        self.assertEqual(await self.saved(), ['one'])
+        await communicator.disconnect()
+
+    @mock.patch.object(consumers, 'FLUSH_BATCH_SIZE', 20)
+    @mock.patch.object(consumers, 'FLUSH_INTERVAL', 0.05)
+    async def test_failed_batch_is_kept_and_retried(self):
+        communicator = await self.connect()
+        with mock.patch.object(consumers, 'record_messages', side_effect=[OperationalError('database is locked'), None]):
+            with self.assertLogs('campusfit.chat', 'ERROR'):
+                await self.send(communicator, 'one')
+                await asyncio.sleep(0.1)
+            await self.send(communicator, 'two')
+            await asyncio.sleep(0.3)
+        self.assertEqual(await self.saved(), ['one', 'two'])
+        await communicator.disconnect()
+
+
+class BookingSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.learner, self.mentor = make_learner(), make_mentor()
+        self.day = timezone.localtime().date() + timedelta(days=2)
+
+    def test_cached_summaries_change_when_bookings_commit(self):
+        self.assertEqual(get_learner_summary(self.learner)['upcoming'], 0)
+        self.assertEqual(get_mentor_summary(self.mentor)['total'], 0)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            create_booking(self.learner, self.mentor, local(self.day, 9))
+            # Still cached until the booking commits.
+            self.assertEqual(get_learner_summary(self.learner)['upcoming'], 0)
+        self.assertTrue(callbacks)
+        self.assertEqual(get_learner_summary(self.learner)['upcoming'], 1)
+        self.assertEqual(get_mentor_summary(self.mentor)['total'], 1)
+
+        past = Booking.objects.create(learner=self.learner, mentor=self.mentor, session_date=timezone.now() - timedelta(days=1))
+        cache.clear()
+        self.assertEqual(get_learner_summary(self.learner)['completed_points'], 0)
+        self.client.force_login(self.learner.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('award_points', args=[past.id]), {'points': 4})
+        summary = get_learner_summary(self.learner)
+        self.assertEqual((summary['completed'], summary['completed_points']), (1, 4))
+
+
+class SmartDietPlanTests(TestCase):
+    MEALS = ('breakfast', 'snack_1', 'lunch', 'snack_2', 'dinner')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_plans_are_close_to_goal_targets(self):
+        for goal, (kcal, protein, _) in GOAL_TARGETS.items():
+            for seed in range(PLAN_VARIANTS):
+                totals = generate_smart_diet_plan(goal, 'non_vegetarian', seed)['totals']
+                with self.subTest(goal=goal, seed=seed):
+                    self.assertAlmostEqual(totals['calories'], kcal, delta=kcal * 0.15)
+                    self.assertAlmostEqual(totals['protein'], protein, delta=protein * 0.15)
+
+    def test_vegetarian_plans_skip_non_vegetarian_food(self):
+        meat = list(FoodItem.objects.filter(vegetarian=False).values_list('name', flat=True))
+        self.assertTrue(meat)
+        for seed in range(PLAN_VARIANTS):
+            plan = generate_smart_diet_plan('muscle_gain', 'vegetarian', seed)
+            text = ' '.join(plan[meal] for meal in self.MEALS)
+            for name in meat:
+                self.assertNotIn(name, text)
+
+    def test_catalog_changes_reach_cached_plans(self):
+        before = generate_smart_diet_plan('weight_loss', 'vegetarian', 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            FoodItem.objects.filter(vegetarian=True, category='protein').update(name=Concat('name', Value(' v2')))
+            FoodItem.objects.first().save()
+        after = generate_smart_diet_plan('weight_loss', 'vegetarian', 0)
+        self.assertNotEqual(before, after)
+        self.assertIn(' v2', ' '.join(after[meal] for meal in self.MEALS))
+
+
+class DietPlansPageTests(TestCase):
+    def test_page_is_dropped_when_the_plan_change_commits(self):
+        cache.clear()
+        render_diet_plans_page('stamina', 'Stamina')
+        key = _diet_page_key('stamina')
+        with self.captureOnCommitCallbacks(execute=True):
+            DietPlan.objects.create(goal='stamina', title='Long run fuel', description='-', content='-')
+            # Dropped before the commit, a concurrent request could re-cache the old page.
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+
+
+class ProfileBackendTests(TestCase):
+    def session_user(self):
+        request = HttpRequest()
+        request.session = self.client.session
+        return get_user(request)
+
+    def test_login_loads_profile_with_user(self):
+        learner, mentor = make_learner(), make_mentor()
+        for user in (learner.user, mentor.user):
+            user.set_password('secret-pass')
+            user.save()
+        self.assertTrue(self.client.login(username=learner.user.username, password='secret-pass'))
+        user = self.session_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(user.learner, learner)
+            self.assertFalse(hasattr(user, 'mentor'))
+
+        self.assertTrue(self.client.login(username=mentor.user.username, password='secret-pass'))
+        user = self.session_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(user.mentor, mentor)
+
+    def test_sessions_from_model_backend_stay_logged_in(self):
+        learner = make_learner()
+        self.client.force_login(learner.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.session_user(), learner.user)
+
+
+class AsyncViewTests(TestCase):
+    BACKENDS = ('app.backends.ProfileBackend', 'django.contrib.auth.backends.ModelBackend')
+
+    def setUp(self):
+        cache.clear()
+        self.learner, self.mentor = make_learner(), make_mentor()
+        Booking.objects.create(learner=self.learner, mentor=self.mentor, session_date=timezone.now() - timedelta(days=1))
+
+    def get(self, view, user, backend):
+        self.client.force_login(user, backend=backend)
+        request = AsyncRequestFactory().get('/')
+        request.session = self.client.session
+        request.auser = partial(aget_user, request)
+        return async_to_sync(view)(request)
+
+    def test_pages_render_with_either_backend(self):
+        pages = [
+            (async_views.learner_dashboard_view, self.learner.user),
+            (async_views.booking_view, self.learner.user),
+            (async_views.progress_tracker_view, self.learner.user),
+            (async_views.mentor_dashboard_view, self.mentor.user),
+            (async_views.booking_view, self.mentor.user),
+        ]
+        for backend in self.BACKENDS:
+            for view, user in pages:
+                with self.subTest(backend=backend, view=view.__name__, role=user.role):
+                    self.assertEqual(self.get(view, user, backend).status_code, 200)
+
+
+class RecommendationTests(TestCase):
+    def test_mentor_changes_retire_precomputed_rows(self):
+        learner = make_learner(goal='stamina')
+        for name in ('Yoga One', 'Yoga Two', 'Yoga Three'):
+            Mentor.objects.filter(pk=make_mentor(name).pk).update(specialization='Yoga', bio='Stretching and mobility')
+        runner = make_mentor('Runner')
+        Mentor.objects.filter(pk=runner.pk).update(status='pending')
+        mentor_index.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(precompute_learner_recommendations(), 1)
+        self.assertEqual(MentorRecommendation.objects.filter(learner=learner).count(), 3)
+        self.assertNotIn(runner, get_recommended_mentors(learner))
+
+        runner.refresh_from_db()
+        runner.status = 'approved'
+        with self.captureOnCommitCallbacks(execute=True):
+            runner.save()
+        self.assertFalse(MentorRecommendation.objects.exists())
+        self.assertEqual(get_recommended_mentors(learner)[0], runner)
+
+
+class StaticPageTests(TestCase):
+    def test_conditional_requests_get_304(self):
+        url = reverse('about')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Accept-Encoding', first['Vary'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], first['ETag'])
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='W/"other"').status_code, 200)
+
+    def test_compressed_bodies(self):
+        url = reverse('about')
+        plain = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain)
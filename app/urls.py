@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Pages with an async variant; see settings.ASYNC_VIEWS.
+dashboard_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path('', views.home_view, name='home'),
@@ -14,16 +18,18 @@ urlpatterns = [
     path('login/', views.login_view, name='login_view'),
     path('logout/', views.logout_view, name='logout'),
     
-    path('learner-dashboard/', views.learner_dashboard_view, name='learner_dash'),
-    path('mentor-dashboard/', views.mentor_dashboard_view, name='mentor_dash'),
+    path('learner-dashboard/', dashboard_views.learner_dashboard_view, name='learner_dash'),
+    path('mentor-dashboard/', dashboard_views.mentor_dashboard_view, name='mentor_dash'),
     
-    path('bookings/', views.booking_view, name='booking'),
+    path('bookings/', dashboard_views.booking_view, name='booking'),
     path('book-session/<int:mentor_id>/', views.book_session_view, name='book_session'),
+    path('availability/', views.mentor_availability_view, name='availability'),
     path('award-points/<int:session_id>/', views.award_points_view, name='award_points'),
     
     path('mentors/', views.mentor_profiles_view, name='mentor_profiles'),
-    path('leaderboard/', views.leaderboard_view, name='leaderboard'),
-    path('progress/', views.progress_tracker_view, name='progress_tracker'),
+    path('mentors/search/', views.mentor_search_view, name='mentor_search'),
+    path('leaderboard/', dashboard_views.leaderboard_view, name='leaderboard'),
+    path('progress/', dashboard_views.progress_tracker_view, name='progress_tracker'),
     
     path('diet-plans/', views.diet_plans_view, name='diet_plans'),
     # --- NEW DYNAMIC DIET PATH ---
@@ -33,4 +39,7 @@ urlpatterns = [
     path('safety-quiz/', views.safety_quiz_view, name='safety_quiz'),
     
     path('chat/<int:booking_id>/', views.chat_view, name='chat'),
+    path('inbox/', views.inbox_view, name='inbox'),
+    
+    path('metrics/views/', views.view_metrics_view, name='view_metrics'),
 ]
\ No newline at end of file
@@ -1,33 +1,41 @@
+import random
 from django.shortcuts import render, redirect
+from django.urls import reverse
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, logout, authenticate
-from .models import User, Learner, Mentor, Booking, DietPlan, Message
+from .models import User, Learner, Mentor, Booking
 from django.utils import timezone
 from datetime import datetime, timedelta
-from django.db.models import Sum, F, ExpressionWrapper, fields
-from django.db.models.functions import Cast
-from django.db.models.expressions import RawSQL
+from django.db.models import F
 from django.contrib import messages
-from django.db import IntegrityError, connection
+from django.db import IntegrityError, transaction
 from .forms import LearnerSignUpForm, MentorSignUpForm
-from .ai_diet_utils import generate_smart_diet_plan # <--- Imported new utility
-
-# --- ML IMPORTS ---
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import linear_kernel
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+from .ai_diet_utils import PLAN_VARIANTS, generate_smart_diet_plan, render_diet_plans_page # <--- Imported new utility
+from .recommendation_utils import get_recommended_mentors
+from .leaderboard_utils import leaderboard
+from .chat_utils import get_inbox, get_message_page, mark_read
+from .middleware import route_metrics
+from .static_page_utils import static_page
+from .search_utils import search_mentors
+from .booking_utils import (
+    SLOT_MINUTES, SlotUnavailable, create_booking, get_free_slots, group_slots_by_day,
+    get_learner_summary, get_mentor_summary,
+)
 
+@static_page('home.html')
 def home_view(request):
     return render(request, 'home.html')
+@static_page('contact.html')
 def contact(request):
     return render(request, 'contact.html')
+@static_page('injuries.html')
 def injuries(request):
     return render(request, 'injuries.html')
+@static_page('shop.html')
 def shop(request):
     return render(request, 'shop.html')
+@static_page('about.html')
 def about(request):
     return render(request, 'about.html')
 def sign_up_selection_view(request):
@@ -112,83 +120,42 @@ def logout_view(request):
     logout(request)
     return redirect('home')
 
-def get_end_time_expression():
-    if connection.vendor == 'sqlite':
-        sql = "datetime(session_date, '+' || duration || ' minutes')"
-    else:
-        sql = "session_date + INTERVAL duration MINUTE"
-    return ExpressionWrapper(RawSQL(sql, []), output_field=fields.DateTimeField())
-
 @login_required
 def learner_dashboard_view(request):
     learner = request.user.learner
-    all_mentors = Mentor.objects.filter(status='approved')
-    recommended_mentors = []
-
-    if all_mentors.exists() and ML_AVAILABLE:
-        try:
-            mentor_descriptions = [f"{m.specialization} {m.bio}" for m in all_mentors]
-            goal_map = {
-                'weight_loss': "Help me lose weight and burn fat cardio high intensity workout diet",
-                'muscle_gain': "Build muscle mass hypertrophy strength lifting bodybuilding",
-                'stamina': "Increase endurance stamina running cardio conditioning aerobic",
-                'flexibility': "Improve flexibility yoga stretching mobility balance",
-                'sports': "Sports performance agility speed athletic training competition",
-                'rehabilitation': "Injury recovery rehabilitation physiotherapy safe low impact",
-            }
-            learner_query = goal_map.get(learner.goal, learner.goal)
-            mentor_descriptions.append(learner_query)
+    recommended_mentors = get_recommended_mentors(learner)
 
-            tfidf = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = tfidf.fit_transform(mentor_descriptions)
-            cosine_sim = linear_kernel(tfidf_matrix[-1], tfidf_matrix[:-1])
-            
-            sim_scores = list(enumerate(cosine_sim[0]))
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
-            for i, score in sim_scores[:3]:
-                recommended_mentors.append(all_mentors[i])
-        except Exception as e:
-            print(f"ML Recommendation Error: {e}")
-            recommended_mentors = Mentor.objects.filter(
-                status='approved', 
-                specialization__icontains=learner.goal.replace('_', ' ')
-            ).order_by('-points')[:3]
-    else:
-        recommended_mentors = Mentor.objects.filter(
-            status='approved', 
-            specialization__icontains=learner.goal.replace('_', ' ')
-        ).order_by('-points')[:3]
-
-    upcoming_session_count = Booking.objects.annotate(
-        end_time=get_end_time_expression()
-    ).filter(learner=learner, end_time__gte=timezone.now()).count()
-    
-    completed_sessions = Booking.objects.filter(learner=learner, status='completed')
+    summary = get_learner_summary(learner)
     
     context = {
         'learner': learner,
         'recommended_mentors': recommended_mentors,
-        'upcoming_session_count': upcoming_session_count,
-        'completed_session_count': completed_sessions.count(),
-        'points_given_to_mentors': completed_sessions.aggregate(total=Sum('points_awarded'))['total'] or 0,
+        'upcoming_session_count': summary['upcoming'],
+        'completed_session_count': summary['completed'],
+        'points_given_to_mentors': summary['completed_points'],
     }
     return render(request, 'learner_dash.html', context)
 
 @login_required
 def mentor_dashboard_view(request):
     mentor = request.user.mentor
-    upcoming_bookings = Booking.objects.annotate(
-        end_time=get_end_time_expression()
-    ).filter(mentor=mentor, end_time__gte=timezone.now()).order_by('session_date')
-    context = {'mentor': mentor, 'upcoming_bookings': upcoming_bookings}
+    upcoming_bookings = (
+        Booking.objects.filter(mentor=mentor, end_time__gte=timezone.now())
+        .select_related('learner__user').order_by('session_date')
+    )
+    context = {
+        'mentor': mentor,
+        'upcoming_bookings': upcoming_bookings,
+        'total_session_count': get_mentor_summary(mentor)['total'],
+    }
     return render(request, 'mentor_dash.html', context)
 
 @login_required
 def booking_view(request):
     user = request.user
     now = timezone.now()
-    all_bookings = Booking.objects.annotate(end_time=get_end_time_expression())
+    # The template shows the other participant's name, so load both users up front.
+    all_bookings = Booking.objects.select_related('mentor__user', 'learner__user')
     if user.role == 'learner':
         upcoming = all_bookings.filter(learner=user.learner, end_time__gte=now).order_by('session_date')
         completed = all_bookings.filter(learner=user.learner, end_time__lt=now).order_by('-session_date')
@@ -198,6 +165,13 @@ def booking_view(request):
     context = {'upcoming_sessions': upcoming, 'completed_sessions': completed, 'user_role': user.role}
     return render(request, 'booking.html', context)
 
+AVAILABILITY_DAYS = 7
+
+def availability_context(mentor):
+    start = timezone.now()
+    slots = get_free_slots(mentor, start, start + timedelta(days=AVAILABILITY_DAYS))[mentor.pk]
+    return {'mentor': mentor, 'availability': group_slots_by_day(slots)}
+
 @login_required
 def book_session_view(request, mentor_id):
     if not hasattr(request.user, 'learner'):
@@ -208,71 +182,119 @@ def book_session_view(request, mentor_id):
     if request.method == 'POST':
         date_str, time_str = request.POST.get('session_date'), request.POST.get('session_time')
         session_start_time = timezone.make_aware(datetime.strptime(f'{date_str} {time_str}', '%Y-%m-%d %H:%M'))
-        session_end_time = session_start_time + timedelta(minutes=30)
         
         if session_start_time < timezone.now():
             messages.error(request, "You cannot book a session in the past.")
-            return render(request, 'book_session_form.html', {'mentor': mentor})
+            return render(request, 'book_session_form.html', availability_context(mentor))
         
-        conflicting_bookings = Booking.objects.annotate(
-            end_time=get_end_time_expression()
-        ).filter(
-            mentor=mentor,
-            session_date__lt=session_end_time,
-            end_time__gt=session_start_time
-        )
-        if conflicting_bookings.exists():
+        try:
+            create_booking(request.user.learner, mentor, session_start_time)
+        except SlotUnavailable:
             messages.error(request, "This time slot is no longer available.")
-            return render(request, 'book_session_form.html', {'mentor': mentor})
-        
-        Booking.objects.create(learner=request.user.learner, mentor=mentor, session_date=session_start_time, duration=30)
+            return render(request, 'book_session_form.html', availability_context(mentor))
         messages.success(request, f"Session with {mentor.user.full_name} booked successfully!")
         return redirect('booking')
-    return render(request, 'book_session_form.html', {'mentor': mentor})
+    return render(request, 'book_session_form.html', availability_context(mentor))
+
+@login_required
+def mentor_availability_view(request):
+    """
+    JSON free-slot listing for one or more mentors, e.g.
+    /availability/?mentor=3&mentor=7&start=2025-01-20&days=7
+    """
+    try:
+        mentor_ids = [int(pk) for pk in request.GET.getlist('mentor')]
+        days = min(int(request.GET.get('days', AVAILABILITY_DAYS)), 31)
+        start_str = request.GET.get('start')
+        if start_str:
+            start = timezone.make_aware(datetime.strptime(start_str, '%Y-%m-%d'))
+        else:
+            start = timezone.now()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid mentor, start or days parameter.'}, status=400)
+    if not mentor_ids:
+        return JsonResponse({'error': 'At least one mentor is required.'}, status=400)
+
+    mentor_ids = list(Mentor.objects.filter(pk__in=mentor_ids, status='approved').values_list('pk', flat=True))
+    free_slots = get_free_slots(mentor_ids, start, start + timedelta(days=days))
+    return JsonResponse({
+        'slot_minutes': SLOT_MINUTES,
+        'mentors': {
+            str(mentor_id): [slot.isoformat() for slot in slots]
+            for mentor_id, slots in free_slots.items()
+        },
+    })
 
 @login_required
 def award_points_view(request, session_id):
     if request.method == 'POST':
-        session = Booking.objects.get(id=session_id, learner=request.user.learner)
         points = int(request.POST.get('points'))
-        session.points_awarded = points
-        session.status = 'completed'
-        session.save()
-        mentor = session.mentor
-        mentor.points += points
-        mentor.save()
+        with transaction.atomic():
+            session = Booking.objects.select_for_update().get(id=session_id, learner=request.user.learner)
+            session.points_awarded = points
+            session.status = 'completed'
+            session.save()
+            # Increment in SQL so concurrent awards to the same mentor can't overwrite each other.
+            Mentor.objects.filter(pk=session.mentor_id).update(points=F('points') + points)
+            new_points = Mentor.objects.values_list('points', flat=True).get(pk=session.mentor_id)
+            transaction.on_commit(lambda: leaderboard.set_points(session.mentor_id, new_points))
         return redirect('booking')
     return redirect('booking')
 
+DIRECTORY_PAGE_SIZE = 24
+
 @login_required
 def mentor_profiles_view(request):
-    mentors = Mentor.objects.filter(status='approved').order_by('-points')
-    return render(request, 'mentor_profiles.html', {'mentors': mentors})
+    # Ranked directory paged by an (points, mentor id) cursor, or search results for ?q=.
+    query = request.GET.get('q', '').strip()
+    next_cursor = None
+    if query:
+        mentors = search_mentors(query, limit=DIRECTORY_PAGE_SIZE)
+    else:
+        try:
+            points, mentor_id = request.GET['after'].split(':')
+            after = (int(points), int(mentor_id))
+        except (KeyError, ValueError):
+            after = None
+        mentors, next_cursor = leaderboard.page(after, DIRECTORY_PAGE_SIZE)
+    return render(request, 'mentor_profiles.html', {
+        'mentors': mentors,
+        'query': query,
+        'next_cursor': f'{next_cursor[0]}:{next_cursor[1]}' if next_cursor else None,
+    })
+
+@login_required
+def mentor_search_view(request):
+    """JSON mentor search over name, specialization and bio, e.g. /mentors/search/?q=yoga"""
+    mentors = search_mentors(request.GET.get('q', ''), limit=DIRECTORY_PAGE_SIZE)
+    return JsonResponse({'mentors': [
+        {
+            'id': m.pk, 'name': m.user.full_name, 'specialization': m.specialization,
+            'bio': m.bio, 'points': m.points, 'book_url': reverse('book_session', args=[m.pk]),
+        }
+        for m in mentors
+    ]})
 
 @login_required
 def leaderboard_view(request):
-    ranked_mentors = Mentor.objects.filter(status='approved').order_by('-points')[:10]
-    return render(request, 'leaderboard.html', {'mentors': ranked_mentors})
+    return render(request, 'leaderboard.html', {'mentors': leaderboard.top(10)})
 
 @login_required
 def progress_tracker_view(request):
     learner = request.user.learner
-    completed = Booking.objects.annotate(
-        end_time=get_end_time_expression()
-    ).filter(learner=learner, end_time__lt=timezone.now())
+    completed = Booking.objects.filter(learner=learner, end_time__lt=timezone.now()).select_related('mentor__user')
+    summary = get_learner_summary(learner)
     context = {
         'completed_sessions': completed,
-        'session_count': completed.count(),
-        'total_points': completed.aggregate(total=Sum('points_awarded'))['total'] or 0,
+        'session_count': summary['past'],
+        'total_points': summary['past_points'],
     }
     return render(request, 'progress_track.html', context)
 
 @login_required
 def diet_plans_view(request):
     learner = request.user.learner
-    plans = DietPlan.objects.filter(goal=learner.goal)
-    context = {'diet_plans': plans, 'learner_goal': learner.get_goal_display()}
-    return render(request, 'diet_plans.html', context)
+    return HttpResponse(render_diet_plans_page(learner.goal, learner.get_goal_display()))
 
 # --- NEW VIEW FOR DYNAMIC DIET ---
 @login_required
@@ -282,8 +304,10 @@ def dynamic_diet_view(request):
     preference = 'vegetarian' # Default
     
     if request.method == 'POST':
-        preference = request.POST.get('preference')
-        plan = generate_smart_diet_plan(learner.goal, preference)
+        if request.POST.get('preference') == 'non_vegetarian':
+            preference = 'non_vegetarian'
+        # Rotate through a few cached variants so regenerating gives a different day.
+        plan = generate_smart_diet_plan(learner.goal, preference, seed=random.randrange(PLAN_VARIANTS))
         
     return render(request, 'dynamic_diet.html', {
         'plan': plan,
@@ -315,7 +339,7 @@ def safety_quiz_view(request):
 
 @login_required
 def chat_view(request, booking_id):
-    booking = Booking.objects.get(id=booking_id)
+    booking = Booking.objects.select_related('learner__user', 'mentor__user').get(id=booking_id)
     if request.user != booking.learner.user and request.user != booking.mentor.user:
         return redirect('home')
     
@@ -324,10 +348,29 @@ def chat_view(request, booking_id):
     else:
         other_user = booking.learner.user
     
-    messages_list = Message.objects.filter(booking=booking).order_by('timestamp')
+    messages_list, has_more = get_message_page(booking)
+    mark_read(request.user, booking)
     
     return render(request, 'chat.html', {
         'booking': booking,
         'other_user': other_user,
-        'messages': messages_list
-    })
\ No newline at end of file
+        'messages': messages_list,
+        'has_more': has_more,
+    })
+
+@login_required
+def inbox_view(request):
+    chats = list(get_inbox(request.user))
+    for chat in chats:
+        booking = chat.booking
+        chat.other_user = booking.mentor.user if request.user.id == booking.learner_id else booking.learner.user
+    return render(request, 'inbox.html', {
+        'chats': chats,
+        'unread_total': sum(chat.unread_count for chat in chats),
+    })
+
+@login_required
+def view_metrics_view(request):
+    if not request.user.is_staff:
+        return redirect('home')
+    return JsonResponse(route_metrics.summary())
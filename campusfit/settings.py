@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -12,6 +13,9 @@ SECRET_KEY = 'django-insecure-your-secret-key-here'
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
+
+# `manage.py test`: tests get their own cache and fail on query budgets.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
 # Allow all hosts (Required for Render)
 ALLOWED_HOSTS = ['*']
 
@@ -35,15 +39,37 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # <--- Required for static files on Render
+    'app.middleware.AsyncWhiteNoiseMiddleware', # <--- Required for static files on Render (WhiteNoise, async-capable)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.ViewMetricsMiddleware', # Per-view query/latency metrics and query budgets
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Serve the dashboard, bookings, progress and leaderboard pages with the async
+# views in app/async_views.py (CAMPUSFIT_ASYNC_VIEWS=1). Only useful under daphne.
+ASYNC_VIEWS = os.environ.get('CAMPUSFIT_ASYNC_VIEWS') == '1'
+
+# Maximum DB queries per request, by URL name. Over-budget requests log a
+# warning, or raise QueryBudgetExceeded when VIEW_QUERY_BUDGET_STRICT is on.
+VIEW_QUERY_BUDGETS = {
+    'learner_dash': 6,
+    'mentor_dash': 6,
+    'booking': 5,
+    'book_session': 8,
+    'progress_tracker': 5,
+    'leaderboard': 3,
+    'mentor_profiles': 3,
+    'chat': 6,
+}
+VIEW_QUERY_BUDGET_STRICT = TESTING
+# Also time template rendering per view (CAMPUSFIT_VIEW_METRICS_TEMPLATES=1).
+# This wraps Template.render for the whole process, so keep it off in production.
+VIEW_METRICS_TEMPLATES = os.environ.get('CAMPUSFIT_VIEW_METRICS_TEMPLATES') == '1'
+
 ROOT_URLCONF = 'campusfit.urls'
 
 TEMPLATES = [
@@ -72,9 +98,56 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when an atomic block starts, so booking
+            # checks and inserts can't interleave (see booking_utils.create_booking).
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,  # busy timeout in seconds
+        },
     }
 }
 
+# Production SQLite profile (CAMPUSFIT_DB_PROFILE=production): WAL so readers
+# don't block behind chat/booking writes, relaxed fsync (safe with WAL), and a
+# larger page cache and memory-mapped reads. `manage.py bench_sqlite` compares
+# it with the defaults. There is no CONN_MAX_AGE: daphne runs each request's
+# sync code on a fresh thread, so a kept connection would never be reused.
+DB_PROFILE = os.environ.get('CAMPUSFIT_DB_PROFILE', 'default')
+SQLITE_TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -32000,  # KiB, i.e. 32 MB per connection
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+if DB_PROFILE == 'production':
+    DATABASES['default']['OPTIONS']['init_command'] = '; '.join(
+        f'PRAGMA {name}={value}' for name, value in SQLITE_TUNED_PRAGMAS.items()
+    )
+
+# Optional read/write split (CAMPUSFIT_DB_READ_ROUTING=1, meant for use with the
+# production profile): safe-method requests read through a separate query_only
+# connection to the same file, so page reads never queue on the connection
+# that holds the write lock.
+if os.environ.get('CAMPUSFIT_DB_READ_ROUTING') == '1':
+    DATABASES['read'] = {
+        **DATABASES['default'],
+        'OPTIONS': {
+            'timeout': 20,
+            'init_command': '; '.join(
+                [f'PRAGMA {name}={value}' for name, value in SQLITE_TUNED_PRAGMAS.items() if name != 'journal_mode']
+                + ['PRAGMA query_only=ON']
+            ),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['app.routers.ReadReplicaRouter']
+    # Before the session middleware, so session and user lookups are routed too.
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware'),
+        'app.routers.ReadOnlyRequestMiddleware',
+    )
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,9 +189,48 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'app.User'
 
+# Loads the user's Learner/Mentor profile in the same query as the user.
+# ModelBackend stays listed so sessions created before ProfileBackend (which
+# store ModelBackend's path) keep working; drop it once those have expired
+# (SESSION_COOKIE_AGE, two weeks).
+AUTHENTICATION_BACKENDS = [
+    'app.backends.ProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Sessions are read from the shared cache and written through to the database.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Cache shared by all worker processes on this host, so invalidations made
+# by one process (e.g. booking summaries) are seen by the others.
+# It holds a booking summary per learner and mentor, the diet pages and, with
+# cached_db, every session. Once MAX_ENTRIES is reached the backend deletes a
+# random third of the files, sessions included (they are then re-read from
+# the database), so keep it well above users x 2. FileBasedCache lists the
+# directory on every set; move to Redis/Memcached before it gets that big.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CAMPUSFIT_CACHE_MAX_ENTRIES', 50000))},
+    }
+}
+if TESTING:
+    # Tests call cache.clear(); never let that reach the project cache directory.
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 # Channels Configuration for WebSockets
+# The SQLite-backed layer shares groups between several daphne processes on
+# this host; use "channels.layers.InMemoryChannelLayer" for a single process.
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
+        "BACKEND": "app.layers.SQLiteChannelLayer",
+        "CONFIG": {
+            "path": BASE_DIR / "channels.sqlite3",
+        },
     }
-}
\ No newline at end of file
+}
+if TESTING:
+    # Booking saves in tests send reminder changes; keep them out of the
+    # channels.sqlite3 a local `run_reminders` worker reads.
+    CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}